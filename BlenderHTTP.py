@@ -54,11 +54,55 @@ class BlenderHttpServer(http.server.BaseHTTPRequestHandler):
             ],
         }
 
+    # Requested format -> (Blender file format, MIME type, file extension)
+    PREVIEW_FORMATS = {
+        'png': ('PNG', 'image/png', '.png'),
+        'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+        'webp': ('WEBP', 'image/webp', '.webp'),
+    }
+
+    @staticmethod
+    def preview_options(rough_max_height=416, format='png', quality=80,
+                        color_mode='rgba', max_size=None):
+        """
+        Check and normalize preview's parameters, raising ValueError for bad ones.
+        Called before the render is scheduled, so bad requests are answered with a 400.
+        """
+        format = 'jpeg' if str(format).lower() == 'jpg' else str(format).lower()
+        if format not in BlenderHttpServer.PREVIEW_FORMATS:
+            raise ValueError('Unsupported format: {}'.format(format))
+        if format == 'webp' and bpy.app.version < (3, 4, 0):
+            raise ValueError('WebP previews need Blender 3.4 or later')
+        color_mode = str(color_mode).upper()
+        if color_mode not in ('RGB', 'RGBA', 'BW'):
+            raise ValueError('Unknown color mode: {}'.format(color_mode))
+        try:
+            quality = max(1, min(100, int(quality)))
+            rough_max_height = max(1, int(rough_max_height))
+            max_size = max(1, int(max_size)) if max_size else None
+        except (TypeError, ValueError):
+            raise ValueError('quality, rough_max_height and max_size must be integers')
+        return rough_max_height, format, quality, color_mode, max_size
+
     @staticmethod
-    def preview(filepath, rough_max_height=416):
+    def preview(filepath, rough_max_height=416, format='png', quality=80,
+                color_mode='rgba', max_size=None):
+        """
+        Render the viewport with OpenGL and return (image bytes, MIME type, metrics).
+
+        format is png, jpeg or webp, quality (1-100) applies to jpeg and webp, and
+        color_mode is rgb, rgba or bw (jpeg has no alpha, so rgba becomes rgb). max_size
+        caps the largest side; without it the height is capped at rough_max_height.
+        """
+        rough_max_height, format, quality, color_mode, max_size = BlenderHttpServer.preview_options(
+            rough_max_height, format, quality, color_mode, max_size)
+        file_format, mime_type, extension = BlenderHttpServer.PREVIEW_FORMATS[format]
+        if file_format == 'JPEG' and color_mode == 'RGBA':
+            color_mode = 'RGB'
+
         temp_dir = tempfile.gettempdir()
         filepath = os.path.join(
-            temp_dir, 'blender_preview_{}.png'.format(str(uuid.uuid4())))
+            temp_dir, 'blender_preview_{}{}'.format(str(uuid.uuid4()), extension))
 
         # Find 3D viewport area
         viewport_area = None
@@ -73,40 +117,56 @@ class BlenderHttpServer(http.server.BaseHTTPRequestHandler):
 
                 break
 
-        assert viewport_area and viewport_region, '3D viewport area not found'
-        assert viewport_region.width > 0 and viewport_region.height > 0, 'Invalid viewport dimensions'
+        if not (viewport_area and viewport_region):
+            raise RuntimeError('3D viewport area not found')
+        if viewport_region.width <= 0 or viewport_region.height <= 0:
+            raise RuntimeError('Invalid viewport dimensions')
 
         # Ensure output directory exists
         output_dir = os.path.dirname(filepath)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
 
+        if max_size:
+            limit, size = max_size, max(viewport_region.width, viewport_region.height)
+        else:
+            limit, size = rough_max_height, viewport_region.height
+        image_settings = {
+            'image_settings.file_format': file_format,
+            'image_settings.color_mode': color_mode,
+        }
+        if file_format == 'PNG':
+            image_settings['image_settings.color_depth'] = '8'
+            image_settings['image_settings.compression'] = 15
+        else:
+            image_settings['image_settings.quality'] = quality
+
         # Use context manager to temporarily modify render settings
+        started = time.perf_counter()
         with render_settings_override(
             resolution_x=viewport_region.width,
             resolution_y=viewport_region.height,
             resolution_percentage=(
-                int(round(100 * rough_max_height / viewport_region.height))
-                if viewport_region.height > rough_max_height else 100
+                max(1, int(round(100 * limit / size))) if size > limit else 100
             ),
             filepath=filepath,
-            **{
-                'image_settings.file_format': 'PNG',
-                'image_settings.color_mode': 'RGBA',
-                'image_settings.color_depth': '8',
-                'image_settings.compression': 15
-            }
+            **image_settings
         ):
             with bpy.context.temp_override(area=viewport_area):
                 bpy.ops.render.opengl(write_still=True)
+        rendered = time.perf_counter()
 
-        # load the temporary file as data uri then clean
+        # read the temporary file then clean
         with open(filepath, 'rb') as f:
             data = f.read()
-            base64_data = base64.b64encode(data).decode('utf-8')
 
         os.remove(filepath)
-        return 'data:image/png;base64,{}'.format(base64_data)
+        metrics = {
+            'render_ms': round((rendered - started) * 1000, 2),
+            'read_ms': round((time.perf_counter() - rendered) * 1000, 2),
+            'bytes': len(data),
+        }
+        return data, mime_type, metrics
 
     def do_GET(self):
         if self.path == '/scene_info':
@@ -134,13 +194,36 @@ class BlenderHttpServer(http.server.BaseHTTPRequestHandler):
         elif self.path == '/preview':
             post_data = self.rfile.read(
                 int(self.headers.get('Content-Length', 0)))
-            data = json.loads(post_data.decode('utf-8') or '{}')
-            image_data_uri = schedule_to_main_thread_then_wait(
-                BlenderHttpServer.preview,
-                data.get('rough_max_height', 416))
+            try:
+                data = json.loads(post_data.decode('utf-8') or '{}')
+                options = BlenderHttpServer.preview_options(
+                    data.get('rough_max_height', 416),
+                    data.get('format', 'png'),
+                    data.get('quality', 80),
+                    data.get('color_mode', 'rgba'),
+                    data.get('max_size'))
+            except (ValueError, AttributeError) as e:
+                self.send_error(400, str(e))
+                return
+            try:
+                image, mime_type, metrics = schedule_to_main_thread_then_wait(
+                    BlenderHttpServer.preview, None, *options)
+            except Exception as e:
+                self.send_error(500, 'Preview failed: {}'.format(e))
+                return
             self.send_response(200)
-            self.end_headers()
-            self.wfile.write(image_data_uri.encode('utf-8'))
+            for name, value in metrics.items():
+                self.send_header('X-Preview-' + name.replace('_', '-').title(), str(value))
+            # "binary" skips the data URI's base64, which inflates the image by a third
+            if data.get('encoding') == 'binary':
+                self.send_header('Content-Type', mime_type)
+                self.send_header('Content-Length', str(len(image)))
+                self.end_headers()
+                self.wfile.write(image)
+            else:
+                self.end_headers()
+                self.wfile.write('data:{};base64,{}'.format(
+                    mime_type, base64.b64encode(image).decode('utf-8')).encode('utf-8'))
 
         else:
             self.send_error(404, 'Not Found')
@@ -223,16 +306,24 @@ class Waitable:
         self.func = func
         self.args = args
         self.result = None
+        self.error = None
         self.done = False
 
     def __call__(self):
-        self.result = self.func(*self.args)
-        self.done = True
+        try:
+            self.result = self.func(*self.args)
+        except Exception as e:
+            # Handed to the waiting thread, which would otherwise wait forever
+            self.error = e
+        finally:
+            self.done = True
 
     def join(self):
         while not self.done:
             time.sleep(0.01)
 
+        if self.error is not None:
+            raise self.error
         return self.result
 
 
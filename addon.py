@@ -1,6 +1,7 @@
 # Code created by Siddharth Ahuja: www.github.com/ahujasid © 2025
 
 import bpy
+import gpu
 import mathutils
 import json
 import threading
@@ -12,10 +13,35 @@ import traceback
 import os
 import shutil
 import zipfile
+import struct
+import selectors
+import collections
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+try:
+    from PIL import Image as PILImage  # Not bundled with Blender, but the fastest JPEG/WebP encoder
+except ImportError:
+    PILImage = None
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
 from contextlib import redirect_stdout, suppress
+import contextlib
 import logging
+import bisect
+import fnmatch
+import re
+import hashlib
+import uuid
+import ast
+import types
+import zlib
+import functools
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: the asset cache index is then only locked within this process
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,13 +58,1056 @@ bl_info = {
 
 RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhofby80NJez"
 
+# Framed wire protocol, kept in sync with src/blender_mcp/protocol.py:
+# magic (4 bytes) | version (u8) | flags (u8) | payload length (u32, big-endian) | JSON payload
+# With FLAG_ATTACHMENTS (version 2+) the payload is: JSON length (u32) | JSON | attachments...
+FRAME_MAGIC = b"BMCP"
+PROTOCOL_VERSION = 2
+ATTACHMENTS_VERSION = 2
+FRAME_HEADER = struct.Struct("!4sBBI")
+JSON_LENGTH = struct.Struct("!I")
+FLAG_ATTACHMENTS = 0x01
+MAX_FRAME_SIZE = 1 << 31
+NEGOTIATE_COMMAND = "negotiate_protocol"
+
+# Socket server limits
+LISTEN_BACKLOG = 64
+MAX_QUEUED_COMMANDS = 256  # across all clients; reading pauses while the queue is full
+MAX_QUEUED_PER_CLIENT = 32
+MAX_COMMANDS_PER_TICK = 64  # the rest run on the next timer tick so the UI stays responsive
+WORKER_THREADS = 4  # for commands that don't touch bpy
+DOWNLOAD_THREADS = 8  # concurrent file downloads within one asset (texture maps, model includes)
+
+# get_scene_info paging
+SCENE_INFO_PAGE_SIZE = 100
+MAX_SCENE_INFO_PAGE_SIZE = 1000
+DEFAULT_SCENE_INFO_FIELDS = ("name", "type", "location")
+MAX_CHANGE_LOG_ENTRIES = 100000  # distinct objects remembered by get_scene_changes
+MAX_SHARED_BUFFERS = 8  # shared memory blocks kept for local clients until they release them
+MAX_REPORTED_ERRORS = 20  # per batch command; the rest are only counted
+MAX_COMPILED_CODE = 128  # execute_code sources kept compiled
+MAX_NAMESPACES = 32  # execute_code sessions whose globals are kept
+OUTPUT_FLUSH_INTERVAL = 0.25  # seconds between streamed chunks of execute_code output
+RUNNING_HEARTBEAT_INTERVAL = 5.0  # seconds between "running" events for long commands
+DEFAULT_TICK_BUDGET = 20.0  # ms of main-thread work per timer tick; see blendermcp_tick_budget
+BATCH_SLICE_SIZE = 500  # set_properties_batch operations between yields to the timer loop
+# Columns are written with one foreach_set over all of bpy.data.objects only when their
+# objects are at least this share of the file; otherwise object by object
+COLUMN_FOREACH_MIN_SHARE = 0.5
+SLICED_SCRIPT = "_mcp_sliced_script"  # the generator a cooperative execute_code runs as
+SCREENSHOT_SUPERSAMPLE = 2  # viewport captures render at this multiple of the output size
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IMAGE_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}  # -> Blender's file_format
+COLOR_MODES = ("rgb", "rgba", "bw")
+MAX_CACHED_CAPTURES = 8  # encoded viewport captures kept for repeat requests
+MAX_CACHED_RESPONSES = 64  # results of cacheable commands, keyed by their params
+RESPONSE_CACHE_TTL = 60.0  # seconds a cacheable command's result is reused for
+MAX_STREAM_FPS = 30.0
+STREAM_SAMPLE_STRIDE = 2  # frame differencing compares every Nth pixel of each row and column
+STREAM_PIXEL_TOLERANCE = 8  # channel difference below which a sampled pixel counts as unchanged
+# Downloaded Poly Haven files are kept here across sessions; Blender processes that share
+# the directory (e.g. on a common volume) share the cache
+ASSET_CACHE_DIR = os.environ.get("BLENDER_MCP_ASSET_CACHE") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "blender-mcp", "assets"
+)
+ASSET_CACHE_MAX_BYTES = int(float(os.environ.get("BLENDER_MCP_ASSET_CACHE_MB", "4096")) * 1024 * 1024)
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # bytes held in memory at a time by download_file
+DOWNLOAD_RETRIES = 3  # resumed attempts after a dropped connection
+DOWNLOAD_PROGRESS_INTERVAL = 0.25  # seconds between progress callbacks
+POLYHAVEN_CATALOG_TTL = 6 * 3600  # seconds before the local Poly Haven catalog is revalidated
+POLYHAVEN_ASSET_TYPES = ("hdris", "textures", "models")  # indexed by the API's type codes
+SEARCH_FIELD_WEIGHTS = (("name", 3), ("tags", 2), ("categories", 1))  # catalog search ranking
+
+# Scene property that enables each optional integration's commands
+INTEGRATION_PROPERTIES = {
+    "polyhaven": "blendermcp_use_polyhaven",
+    "hyper3d": "blendermcp_use_hyper3d",
+    "sketchfab": "blendermcp_use_sketchfab",
+}
+
+
+def _round_vector(vector, digits=3):
+    return [round(float(value), digits) for value in vector]
+
+
+def _png_chunk(tag, data):
+    return struct.pack("!I", len(data)) + tag + data + struct.pack("!I", zlib.crc32(tag + data))
+
+
+def _encode_png(pixels, compression=1):
+    """
+    Encode a (height, width, channels) uint8 array as PNG with zlib alone, since Blender's
+    Python has no imaging library. Rows use the "up" filter, which costs one vectorized
+    subtraction and compresses viewport images far better than no filter.
+    """
+    height, width, channels = pixels.shape
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    rows = np.ascontiguousarray(pixels).reshape(height, width * channels)
+    filtered = np.empty((height, width * channels + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])  # wraps modulo 256, as PNG wants
+    return b"".join([
+        PNG_SIGNATURE,
+        _png_chunk(b"IHDR", struct.pack("!IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), compression)),
+        _png_chunk(b"IEND", b""),
+    ])
+
+
+def _downsample(pixels, factor):
+    """Box-filter an image down by an integer factor"""
+    if factor <= 1:
+        return pixels
+    height, width = pixels.shape[0] // factor, pixels.shape[1] // factor
+    pixels = pixels[:height * factor, :width * factor]
+    # Summing strided slices is far faster than a mean over a reshaped view; uint16 holds
+    # the sums for factors up to 16
+    total = np.full((height, width, pixels.shape[2]), factor * factor // 2, dtype=np.uint16)
+    for dy in range(factor):
+        for dx in range(factor):
+            total += pixels[dy::factor, dx::factor]
+    return (total // (factor * factor)).astype(np.uint8)
+
+
+def _luma(pixels):
+    """Grayscale (height, width, 1) from RGB, with Rec. 709 weights"""
+    luma = pixels[:, :, :3] @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+    return np.round(luma).astype(np.uint8)[:, :, None]
+
+
+def _encode_with_blender(pixels, image_format, quality):
+    """Encode through a temporary Blender image, for when Pillow isn't available"""
+    height, width, channels = pixels.shape
+    rgba = np.ones((height, width, 4), dtype=np.float32)
+    rgba[:, :, :3] = pixels[::-1, :, :3] / 255.0  # Blender's rows start at the bottom
+    if channels == 4:
+        rgba[:, :, 3] = pixels[::-1, :, 3] / 255.0
+    image = bpy.data.images.new("mcp_capture", width, height, alpha=channels == 4)
+    fd, path = tempfile.mkstemp(suffix="." + image_format)
+    os.close(fd)
+    try:
+        image.pixels.foreach_set(rgba.reshape(-1))
+        image.filepath_raw = path
+        image.file_format = IMAGE_FORMATS[image_format]
+        try:
+            image.save(quality=quality)
+        except TypeError:
+            image.save()  # Blender versions whose save() has no quality argument
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        bpy.data.images.remove(image)
+        with suppress(OSError):
+            os.remove(path)
+
+
+def _encode_image(pixels, image_format, quality):
+    """
+    Encode (height, width, channels) uint8 pixels with the fastest encoder at hand and
+    return (bytes, encoder name): PNG always uses _encode_png, JPEG and WebP use Pillow
+    if it's installed and Blender's image writer otherwise.
+    """
+    if image_format == "png":
+        return _encode_png(pixels), "zlib"
+    if PILImage is None:
+        return _encode_with_blender(pixels, image_format, quality), "blender"
+    output = io.BytesIO()
+    options = {"method": 0} if image_format == "webp" else {}  # WebP's fastest effort level
+    PILImage.fromarray(pixels[:, :, 0] if pixels.shape[2] == 1 else pixels).save(
+        output, format=image_format.upper(), quality=quality, **options
+    )
+    return output.getvalue(), "pillow"
+
+
+def _split_list(value):
+    """Accept either a list or a comma-separated string"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
+
+
+class CommandSpec:
+    """What the dispatcher needs to know about a command, declared with @command"""
+    __slots__ = ("name", "method", "integration", "main_thread", "cacheable", "prepare")
+
+    def __init__(self, name, method, integration=None, main_thread=True, cacheable=False, prepare=None):
+        self.name = name
+        self.method = method  # Attribute name of the handler on BlenderMCPServer
+        self.integration = integration  # Key of INTEGRATION_PROPERTIES, or None if always available
+        self.main_thread = main_thread  # False if the handler never touches bpy
+        # Result depends only on the params, not on scene state, so it's served from the
+        # response cache for RESPONSE_CACHE_TTL seconds
+        self.cacheable = cacheable
+        # Attribute name of a method that does the command's network/disk work on a worker
+        # thread. It takes the command's params and returns either {"error": ...}, which is
+        # sent as the result, or data passed to the handler as its `prepared` argument.
+        self.prepare = prepare
+
+
+def command(name=None, integration=None, main_thread=True, cacheable=False, prepare=None):
+    """Mark a BlenderMCPServer method as a command handler"""
+    def decorator(func):
+        func.command_spec = CommandSpec(name or func.__name__, func.__name__, integration,
+                                        main_thread, cacheable, prepare)
+        return func
+    return decorator
+
+
+def _encode_frame(message, flags=0, version=PROTOCOL_VERSION, attachments=()):
+    if not attachments:
+        payload = json.dumps(message).encode('utf-8')
+        return FRAME_HEADER.pack(FRAME_MAGIC, version, flags, len(payload)) + payload
+    views = [memoryview(data).cast('B') for data in attachments]
+    text = json.dumps(dict(message, attachments=[view.nbytes for view in views])).encode('utf-8')
+    length = JSON_LENGTH.size + len(text) + sum(view.nbytes for view in views)
+    header = FRAME_HEADER.pack(FRAME_MAGIC, version, flags | FLAG_ATTACHMENTS, length)
+    return b''.join([header, JSON_LENGTH.pack(len(text)), text, *views])
+
+
+def _decode_payload(payload, flags):
+    if not flags & FLAG_ATTACHMENTS:
+        return json.loads(payload)
+    view = memoryview(payload)
+    (text_length,) = JSON_LENGTH.unpack_from(view)
+    offset = JSON_LENGTH.size + text_length
+    message = json.loads(view[JSON_LENGTH.size:offset].tobytes())
+    attachments = []
+    for length in message.get("attachments", []):
+        attachments.append(view[offset:offset + length])
+        offset += length
+    if offset != len(payload):
+        raise ValueError("Attachment lengths don't match the frame size")
+    message["attachments"] = attachments
+    return message
+
+
+def _resolve_attachments(params, attachments):
+    """
+    Replace params of the form {"attachment": index, "dtype": "<f4", "shape": [n, 3]},
+    at the top level or inside a dict param, with NumPy arrays viewing that attachment.
+    Base64 strings (from clients that predate binary frames) are decoded first.
+    """
+    def resolve(value):
+        if not isinstance(value, dict):
+            return value
+        if "attachment" not in value:
+            return {key: resolve(item) for key, item in value.items()}
+        data = attachments[value["attachment"]]
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+        array = np.frombuffer(data, dtype=np.dtype(value.get("dtype", "|u1")))
+        return array.reshape(value["shape"]) if "shape" in value else array
+    return {key: resolve(value) for key, value in params.items()}
+
+
+class StreamingOutput(io.StringIO):
+    """
+    stdout for execute_code: keeps the full output for the final result and also
+    streams it to the requesting client as "output" events, a chunk at most every
+    OUTPUT_FLUSH_INTERVAL seconds.
+    """
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+    def write(self, text):
+        count = super().write(text)
+        self.pending.append(text)
+        if time.monotonic() - self.last_flush >= OUTPUT_FLUSH_INTERVAL:
+            self.flush()
+        return count
+
+    def flush(self):
+        if self.pending:
+            self.server.emit("output", {"text": "".join(self.pending)})
+            self.pending.clear()
+        self.last_flush = time.monotonic()
+
+
+class SlicedTask:
+    """
+    A cooperative command, i.e. a handler that returned a generator. Every next() is one
+    slice; the drain timer runs slices until the tick budget is spent and resumes the
+    rest on a later tick, so the UI and other clients get the main thread in between.
+    """
+    __slots__ = ("client", "command", "generator", "started", "slices", "busy", "longest")
+
+    def __init__(self, client, command, generator):
+        self.client = client
+        self.command = command
+        self.generator = generator
+        self.started = time.perf_counter()
+        self.slices = 0
+        self.busy = 0.0
+        self.longest = 0.0
+
+    def step(self):
+        """Run one slice; raises StopIteration with the result once the handler is done"""
+        start = time.perf_counter()
+        try:
+            next(self.generator)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.slices += 1
+            self.busy += elapsed
+            self.longest = max(self.longest, elapsed)
+
+    def timing(self):
+        return {
+            "slices": self.slices,
+            "busy_ms": round(self.busy * 1000, 2),
+            "longest_slice_ms": round(self.longest * 1000, 2),
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 2),
+        }
+
+
+class ViewportStream:
+    """
+    A client's viewport stream: frames pushed at up to ``fps`` by a timer, but only when
+    the view or scene changed visibly since the last frame sent
+    """
+    def __init__(self, client, fps, options, min_change):
+        self.client = client
+        self.interval = 1.0 / fps
+        self.options = options  # (max_size, image format, quality, color mode)
+        self.min_change = min_change  # fraction of sampled pixels that must differ
+        self.active = True
+        self.fingerprint = None
+        self.sample = None  # sampled pixels of the last frame sent
+        self.sequence = 0
+        self.unchanged = 0
+        self.dropped = 0
+
+    def stats(self):
+        return {"frames": self.sequence, "unchanged": self.unchanged, "dropped": self.dropped}
+
+
+class BinaryResult:
+    """
+    A handler result whose bulk data travels as raw binary attachments. ``result``
+    refers to ``buffers`` by index; clients on protocol version 1 or the legacy
+    stream get the buffers base64-encoded instead.
+    """
+    __slots__ = ("result", "buffers")
+
+    def __init__(self, result, buffers):
+        self.result = result
+        self.buffers = buffers
+
+
+class QueuedCommand:
+    """
+    A command in a client's main-thread queue. One with a prepare phase holds its place
+    from the moment it arrives, not ready until that phase is done, so the client's later
+    commands can't overtake it.
+    """
+    __slots__ = ("command", "prepared", "ready")
+
+    def __init__(self, command, prepared=None, ready=True):
+        self.command = command
+        self.prepared = prepared
+        self.ready = ready
+
+
+class ClientConnection:
+    """
+    One MCP server connected to the addon.
+
+    Owned by the server thread, which does all reads and writes on the non-blocking
+    socket. The main thread only appends to ``outgoing`` (under ``lock``) and wakes the
+    server thread to flush it.
+    """
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.framed = False  # Switched on once negotiate_protocol picks a framed version
+        self.protocol_version = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.commands = collections.deque()  # QueuedCommands waiting for the main thread
+        self.outgoing = collections.deque()  # Encoded messages waiting to be written
+        self.processed = 0
+        # Incremental frame reader: the header, then a buffer preallocated to the payload size
+        self._legacy_buffer = b''
+        self._header = bytearray(FRAME_HEADER.size)
+        self._payload = None
+        self._flags = 0
+        self._filled = 0
+
+    def read_messages(self):
+        """Read whatever the socket has and return the complete messages in it"""
+        messages = []
+        while True:
+            try:
+                if self.framed:
+                    message = self._read_frame()
+                else:
+                    message = self._read_legacy()
+            except BlockingIOError:
+                return messages
+            if message is not None:
+                messages.append(message)
+
+    def _read_frame(self):
+        target = self._header if self._payload is None else self._payload
+        count = self.sock.recv_into(memoryview(target)[self._filled:])
+        if count == 0:
+            raise ConnectionError("Client disconnected")
+        self._filled += count
+        if self._filled < len(target):
+            return None
+        self._filled = 0
+        if self._payload is None:
+            magic, version, flags, length = FRAME_HEADER.unpack(self._header)
+            if magic != FRAME_MAGIC or version > PROTOCOL_VERSION or not 0 < length <= MAX_FRAME_SIZE:
+                raise ValueError(f"Invalid frame header: {bytes(self._header)!r}")
+            self._payload = bytearray(length)
+            self._flags = flags
+            return None
+        payload, self._payload = self._payload, None
+        return _decode_payload(payload, self._flags)
+
+    def _read_legacy(self):
+        data = self.sock.recv(8192)
+        if not data:
+            raise ConnectionError("Client disconnected")
+        self._legacy_buffer += data
+        try:
+            # Try to parse command
+            command = json.loads(self._legacy_buffer.decode('utf-8'))
+        except json.JSONDecodeError:
+            # Incomplete data, wait for more
+            return None
+        self._legacy_buffer = b''
+        return command
+
+    def send(self, message, attachments=()):
+        """Queue a message for the server thread to write, in this client's wire format"""
+        if attachments and self.protocol_version < ATTACHMENTS_VERSION:
+            message = dict(message, attachments=[base64.b64encode(data).decode('ascii') for data in attachments])
+            attachments = ()
+        if self.framed:
+            data = _encode_frame(message, version=self.protocol_version, attachments=attachments)
+        else:
+            data = json.dumps(message).encode('utf-8')
+        with self.lock:
+            if self.closed:
+                return False
+            self.outgoing.append(memoryview(data))
+        return True
+
+    def flush(self):
+        """Write as much queued output as the socket accepts; True if some is left over"""
+        with self.lock:
+            while self.outgoing:
+                data = self.outgoing[0]
+                try:
+                    sent = self.sock.send(data)
+                except BlockingIOError:
+                    return True
+                if sent < len(data):
+                    self.outgoing[0] = data[sent:]
+                    return True
+                self.outgoing.popleft()
+            return False
+
+
+class SceneChangeLog:
+    """
+    Versioned record of which objects changed, fed by a depsgraph_update_post handler.
+    Only the latest change of each object is kept, in version order, so reading the
+    changes since a version costs O(changes) rather than O(scene).
+    """
+
+    def __init__(self, max_entries=MAX_CHANGE_LOG_ENTRIES):
+        self.max_entries = max_entries
+        self.version = 0
+        self.updates = 0  # Every depsgraph update, including ones that touch no object
+        self.oldest_version = 0  # Callers behind this must resync from get_scene_info
+        self.entries = collections.OrderedDict()  # name -> (version, set of change kinds)
+        self.scene_key = None
+        self.object_names = None  # Known names, diffed to spot additions and removals
+
+    def reset(self):
+        """Forget everything; callers at this version or older are told to resync"""
+        self.entries.clear()
+        # A new version, so even a caller that was up to date is behind oldest_version
+        self.version += 1
+        self.oldest_version = self.version
+        self.scene_key = None
+        self.object_names = None
+
+    def record(self, name, kind):
+        self.version += 1
+        previous = self.entries.pop(name, None)
+        kinds = previous[1] if previous else set()
+        if kind == "removed":
+            kinds = {"removed"}
+        else:
+            kinds.discard("removed")
+            kinds.add(kind)
+        self.entries[name] = (self.version, kinds)
+        if len(self.entries) > self.max_entries:
+            _, (evicted_version, _) = self.entries.popitem(last=False)
+            self.oldest_version = evicted_version
+
+    def on_depsgraph_update(self, scene, depsgraph):
+        self.updates += 1
+        scene_key = scene.as_pointer()
+        if scene_key != self.scene_key:
+            # Switched scenes: nothing recorded so far describes this one
+            self.reset()
+            self.scene_key = scene_key
+            self.object_names = {obj.name for obj in scene.objects}
+            return
+
+        structure_changed = False
+        for update in depsgraph.updates:
+            id_data = update.id
+            if isinstance(id_data, bpy.types.Object):
+                if update.is_updated_geometry:
+                    self.record(id_data.original.name, "geometry")
+                if update.is_updated_transform:
+                    self.record(id_data.original.name, "transform")
+                if not (update.is_updated_geometry or update.is_updated_transform):
+                    self.record(id_data.original.name, "data")
+            elif isinstance(id_data, (bpy.types.Scene, bpy.types.Collection)):
+                structure_changed = True
+
+        # Objects being added, removed or renamed only shows up as a scene/collection update
+        if structure_changed:
+            names = {obj.name for obj in scene.objects}
+            for name in names - self.object_names:
+                self.record(name, "added")
+            for name in self.object_names - names:
+                self.record(name, "removed")
+            self.object_names = names
+
+    def since(self, version):
+        """(version, name, kinds) for every object changed after `version`, oldest first"""
+        changes = []
+        for name, (entry_version, kinds) in reversed(self.entries.items()):
+            if entry_version <= version:
+                break
+            changes.append((entry_version, name, kinds))
+        changes.reverse()
+        return changes
+
+
+scene_change_log = SceneChangeLog()
+
+
+class TextureRegistry:
+    """
+    Images of downloaded Poly Haven textures by texture ID and map type, kept as
+    download_polyhaven_asset imports them so set_texture needn't scan bpy.data.images.
+    Image names are held rather than datablocks, which don't survive undo; an entry whose
+    images were renamed or removed reads as missing.
+    """
+
+    def __init__(self):
+        self.textures = {}  # texture ID -> {map type: image name}
+
+    def set(self, texture_id, images):
+        self.textures[texture_id] = {map_type: image.name for map_type, image in images.items()}
+
+    def images(self, texture_id):
+        """{map type: image} for a registered texture, or None"""
+        names = self.textures.get(texture_id)
+        if not names:
+            return None
+        images = {map_type: bpy.data.images.get(name) for map_type, name in names.items()}
+        if None in images.values():
+            del self.textures[texture_id]
+            return None
+        return images
+
+    def reset(self):
+        self.textures.clear()
+
+
+texture_registry = TextureRegistry()
+
+
+def _texture_map_key(image_name):
+    """The map type set_texture knows an image by, from its "<texture>_<map>.<ext>" name"""
+    return image_name.split('_')[-1].split('.')[0]
+
+
+def _set_map_colorspace(image, map_type):
+    """sRGB for color maps, Non-Color otherwise. Only written when it differs, since
+    changing the color space makes Blender free the image's loaded pixels."""
+    colorspace = 'sRGB' if map_type.lower() in ['color', 'diffuse', 'albedo'] else 'Non-Color'
+    if image.colorspace_settings.name != colorspace:
+        with suppress(Exception):  # Use default if not available
+            image.colorspace_settings.name = colorspace
+
+
+def _make_http_session():
+    """A keep-alive session for Poly Haven, with a connection pool as big as the download pool"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=DOWNLOAD_THREADS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_session = _make_http_session()
+
+
+def _stream_into(f, url, size, progress, timeout):
+    """
+    download_file's transfer loop: append ``url`` to the open partial file ``f``, resuming
+    after the bytes already in it. Returns (bytes in the file, md5 of them, total or None).
+    """
+    f.seek(0)
+    digest = hashlib.md5()
+    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    done, total = f.tell(), size
+    reported = time.monotonic()
+    attempt = 0
+    while total is None or done < total:
+        headers = {"Range": f"bytes={done}-"} if done else None
+        try:
+            with http_session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416:
+                    # Nothing past the end of the partial file: done if it's the whole thing,
+                    # otherwise it's stale and the next attempt starts afresh
+                    if response.headers.get("Content-Range", "").rpartition("/")[2] == str(done):
+                        break
+                    f.truncate(0)
+                    done, digest = 0, hashlib.md5()
+                    continue
+                response.raise_for_status()
+                if response.status_code == 206:
+                    length = response.headers.get("Content-Range", "").rpartition("/")[2]
+                else:
+                    # No range support (or a fresh start): begin again from the first byte
+                    f.truncate(0)
+                    done, digest = 0, hashlib.md5()
+                    length = response.headers.get("Content-Length", "")
+                if total is None and length.isdigit():
+                    total = int(length)
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    done += len(chunk)
+                    if progress and time.monotonic() - reported >= DOWNLOAD_PROGRESS_INTERVAL:
+                        progress(done, total)
+                        reported = time.monotonic()
+            if total is None:
+                break  # Read to the end, with no length to hold it to
+            if done < total:
+                raise requests.exceptions.ConnectionError(f"Connection closed at {done} of {total} bytes")
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError) as e:
+            # The partial file stays, so even a final failure can be resumed later
+            f.flush()
+            attempt += 1
+            if attempt > DOWNLOAD_RETRIES:
+                raise
+            logger.info(f"Download of {url} interrupted at {done} bytes, resuming: {str(e)}")
+            time.sleep(0.5 * 2 ** (attempt - 1))
+    f.flush()
+    return done, digest, total
+
+
+def download_file(url, path, md5=None, size=None, progress=None, timeout=60):
+    """
+    Stream ``url`` into ``path`` one chunk at a time, so memory use doesn't grow with the
+    file. Data goes to ``path + ".part"`` and is renamed into place only once its size and
+    md5 (when given) check out. A dropped connection resumes where it stopped with an HTTP
+    Range request, and so does a later call for the same path after an interruption.
+    ``progress(done, total)`` is called as bytes arrive; ``total`` is None when unknown.
+    """
+    partial = f"{path}.part"
+    existed = os.path.exists(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        while True:
+            f = open(partial, "a+b")
+            if not fcntl:
+                break
+            # Another thread or process is on the same file: wait for it, then reuse its work
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                current = os.stat(partial).st_ino
+            except FileNotFoundError:
+                current = None
+            if current == os.fstat(f.fileno()).st_ino:
+                break
+            f.close()  # The holder renamed or removed the file we opened, so lock the new one
+        with f:
+            if fcntl and not existed and os.path.exists(path):
+                if not os.fstat(f.fileno()).st_size:
+                    os.remove(partial)  # Nothing to resume, the file is already done
+                return path
+            done, digest, total = _stream_into(f, url, size, progress, timeout)
+            if progress:
+                progress(done, total)
+            if size is not None and done != size:
+                raise ValueError(f"Size mismatch for {os.path.basename(path)}: got {done} bytes, expected {size}")
+            if md5 and digest.hexdigest() != md5:
+                raise ValueError(f"Checksum mismatch for {os.path.basename(path)}")
+            if fcntl:
+                os.replace(partial, path)  # Still holding the lock, so waiters see the finished file
+    except ValueError:
+        with suppress(OSError):
+            os.remove(partial)  # Bad data, nothing worth resuming
+        raise
+    except Exception:
+        # Keep received data for a resume, but not an empty file from a request that failed
+        with suppress(OSError):
+            if not os.path.getsize(partial):
+                os.remove(partial)
+        raise
+    if not fcntl:
+        os.replace(partial, path)  # Windows can't rename a file that is still open
+    return path
+
+
+class AssetCache:
+    """
+    Content-addressed on-disk cache of downloaded asset files.
+
+    A file is stored under its upstream hash (Poly Haven's md5, or a hash of its URL when
+    there is none) with its original name, so repeat downloads of the same asset, resolution
+    and format are served from disk. Files are downloaded with download_file, so readers
+    never see a partial file and an interrupted download resumes on the next fetch.
+    ``index.json`` records each entry's size and last use; once the total exceeds
+    ``max_bytes`` the least recently used entries are deleted, so images loaded from the
+    cache are packed (or copied to ``pinned/``, which is never evicted). The index is
+    rewritten atomically under a lock file, so several Blender processes can share one
+    cache directory.
+    """
+
+    def __init__(self, root=ASSET_CACHE_DIR, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def path_for(self, digest, filename):
+        return os.path.join(self.root, "blobs", digest[:2], digest, filename)
+
+    def fetch(self, url, filename, md5=None, size=None, keep=(), progress=None):
+        """
+        Return (local path, cache hit) for the file at ``url``, downloading it on a miss.
+        ``keep`` lists digests that eviction must leave alone, e.g. the other files of the
+        asset being fetched. ``progress`` is passed on to download_file.
+        """
+        digest = md5 or hashlib.sha1(url.encode('utf-8')).hexdigest()
+        path = self.path_for(digest, filename)
+        if os.path.exists(path) and (size is None or os.path.getsize(path) == size):
+            self._record(digest, path, filename, keep)
+            return path, True
+
+        download_file(url, path, md5, size, progress)
+        self._record(digest, path, filename, keep)
+        return path, False
+
+    def _record(self, digest, path, filename, keep):
+        """Mark an entry as just used, then evict down to the size cap"""
+        with self._locked():
+            index = self._read_index()
+            index[digest] = {"file": filename, "size": os.path.getsize(path), "last_used": time.time()}
+            total = sum(entry["size"] for entry in index.values())
+            for old_digest in sorted(index, key=lambda d: index[d]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                if old_digest == digest or old_digest in keep:
+                    continue
+                total -= index.pop(old_digest)["size"]
+                shutil.rmtree(os.path.dirname(self.path_for(old_digest, "_")), ignore_errors=True)
+            self._write_index(index)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self.lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, "index.lock"), "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.root, "index.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}  # Missing or unreadable: rebuilt as files are used
+
+    def _write_index(self, index):
+        path = os.path.join(self.root, "index.json")
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial, "w") as f:
+            json.dump(index, f)
+        os.replace(partial, path)
+
+
+asset_cache = AssetCache()
+
+
+def _search_tokens(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class PolyHavenCatalog:
+    """
+    Local copy of the Poly Haven asset list, with an inverted index for searching it.
+
+    The list is downloaded once, or loaded from the copy saved in the asset cache directory,
+    and then answers category and search queries without a network round trip. Once it is
+    older than ``ttl`` the stale copy keeps being served while a background thread
+    revalidates it with If-None-Match/If-Modified-Since, so an unchanged catalog costs a 304
+    and searches keep working offline.
+    """
+
+    URL = "https://api.polyhaven.com/assets"
+
+    def __init__(self, path=os.path.join(ASSET_CACHE_DIR, "polyhaven_catalog.json"), ttl=POLYHAVEN_CATALOG_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.catalog = None  # {"assets", "etag", "last_modified", "fetched"}
+        self.index = None  # Built from catalog["assets"]; replaced whole, so readers need no lock
+        self.loaded = False
+        self.refreshing = False
+
+    def categories(self, asset_type):
+        """{category: asset count} for one asset type or "all", like /categories/<type>"""
+        return self._current()["counts"][asset_type]
+
+    def search(self, asset_type=None, categories=None, query=None, limit=20):
+        """
+        Assets of ``asset_type`` in all of the comma-separated ``categories``, best first:
+        by relevance to ``query`` when given (name matches over tags over categories, with
+        the last word also matching as a prefix), then by download count.
+        Returns ([(asset_id, asset)], total matches).
+        """
+        index = self._current()
+        assets = index["assets"]
+        type_code = POLYHAVEN_ASSET_TYPES.index(asset_type) if asset_type and asset_type != "all" else None
+        candidates = None
+        for category in (categories or "").split(","):
+            if category.strip():
+                found = index["categories"].get(category.strip().lower(), set())
+                candidates = found if candidates is None else candidates & found
+        if query and _search_tokens(query):
+            scores = self._score(index, _search_tokens(query))
+            ranked = sorted(scores, key=lambda a: (-scores[a], -assets[a].get("download_count", 0)))
+        else:
+            ranked = index["popular"]
+        matches = [
+            asset_id for asset_id in ranked
+            if (type_code is None or assets[asset_id].get("type") == type_code)
+            and (candidates is None or asset_id in candidates)
+        ]
+        return [(asset_id, assets[asset_id]) for asset_id in matches[:limit]], len(matches)
+
+    @staticmethod
+    def _score(index, terms):
+        """Sum of each term's best field weight, for assets that match every term"""
+        scores = None
+        for i, term in enumerate(terms):
+            term_scores = dict(index["postings"].get(term, {}))
+            if i == len(terms) - 1:
+                # The last word may still be being typed: half weight for longer words it begins
+                vocabulary = index["vocabulary"]
+                for token in vocabulary[bisect.bisect_right(vocabulary, term):]:
+                    if not token.startswith(term):
+                        break
+                    for asset_id, weight in index["postings"][token].items():
+                        term_scores[asset_id] = max(term_scores.get(asset_id, 0), weight / 2)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {asset_id: score + term_scores[asset_id]
+                          for asset_id, score in scores.items() if asset_id in term_scores}
+        return scores
+
+    def _current(self):
+        """The index, fetching the catalog first if there is none and revalidating it if stale"""
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                self._load()
+            stale = self.catalog is not None and time.time() - self.catalog["fetched"] > self.ttl
+            if stale and not self.refreshing:
+                self.refreshing = True
+                threading.Thread(target=self._refresh_in_background, name="blendermcp-catalog",
+                                 daemon=True).start()
+        if self.index is None:
+            with self.refresh_lock:
+                if self.index is None:  # Unless another thread just fetched it
+                    self._refresh()
+        return self.index
+
+    def _refresh_in_background(self):
+        try:
+            with self.refresh_lock:
+                self._refresh()
+        except Exception as e:
+            logger.info(f"Could not revalidate the Poly Haven catalog, keeping the old one: {str(e)}")
+        finally:
+            self.refreshing = False
+
+    def _refresh(self):
+        catalog = self.catalog
+        headers = {}
+        if catalog and catalog.get("etag"):
+            headers["If-None-Match"] = catalog["etag"]
+        if catalog and catalog.get("last_modified"):
+            headers["If-Modified-Since"] = catalog["last_modified"]
+        response = http_session.get(self.URL, headers=headers, timeout=30)
+        if response.status_code == 304 and catalog:
+            self.catalog = dict(catalog, fetched=time.time())
+        else:
+            response.raise_for_status()
+            catalog = {
+                "assets": response.json(),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched": time.time(),
+            }
+            self.index = self._build_index(catalog["assets"])
+            self.catalog = catalog
+            logger.info(f"Fetched the Poly Haven catalog: {len(catalog['assets'])} assets")
+        try:
+            self._save(self.catalog)
+        except OSError as e:
+            logger.info(f"Could not save the Poly Haven catalog: {str(e)}")
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                catalog = json.load(f)
+            self.index = self._build_index(catalog["assets"])
+            self.catalog = catalog
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Missing or unreadable: fetched on first use
+
+    def _save(self, catalog):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        partial = f"{self.path}.{uuid.uuid4().hex}.part"
+        with open(partial, "w") as f:
+            json.dump(catalog, f)
+        os.replace(partial, self.path)
+
+    @staticmethod
+    def _build_index(assets):
+        postings = collections.defaultdict(dict)  # token -> {asset_id: best field weight}
+        categories = collections.defaultdict(set)  # lowercased category -> asset IDs
+        counts = {asset_type: collections.Counter() for asset_type in POLYHAVEN_ASSET_TYPES + ("all",)}
+        for asset_id, asset in assets.items():
+            type_code = asset.get("type")
+            type_counts = [counts["all"]]
+            if type_code in (0, 1, 2):
+                type_counts.append(counts[POLYHAVEN_ASSET_TYPES[type_code]])
+            for category in asset.get("categories", ()):
+                categories[category.lower()].add(asset_id)
+                for type_count in type_counts:
+                    type_count[category] += 1
+            for type_count in type_counts:
+                type_count["all"] += 1
+            fields = {"name": [asset_id, asset.get("name", "")], "tags": asset.get("tags", ()),
+                      "categories": asset.get("categories", ())}
+            for field, weight in SEARCH_FIELD_WEIGHTS:
+                for text in fields[field]:
+                    for token in _search_tokens(text):
+                        if postings[token].get(asset_id, 0) < weight:
+                            postings[token][asset_id] = weight
+        return {
+            "assets": assets,
+            "postings": dict(postings),
+            "vocabulary": sorted(postings),
+            "categories": dict(categories),
+            "counts": {asset_type: dict(type_counts) for asset_type, type_counts in counts.items()},
+            "popular": sorted(assets, key=lambda a: assets[a].get("download_count", 0), reverse=True),
+        }
+
+
+polyhaven_catalog = PolyHavenCatalog()
+
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph):
+    scene_change_log.on_depsgraph_update(scene, depsgraph)
+
+
+@bpy.app.handlers.persistent
+def _on_load_post(*args):
+    scene_change_log.reset()
+    texture_registry.reset()
+
+
 class BlenderMCPServer:
+    # Every command handler, collected from the @command decorators once at register time
+    command_registry = None
+
+    @classmethod
+    def build_command_registry(cls):
+        cls.command_registry = {
+            func.command_spec.name: func.command_spec
+            for func in vars(cls).values()
+            if hasattr(func, "command_spec")
+        }
+        return cls.command_registry
+
     def __init__(self, host='localhost', port=9876):
+        if BlenderMCPServer.command_registry is None:
+            BlenderMCPServer.build_command_registry()
         self.host = host
         self.port = port
         self.running = False
         self.socket = None
         self.server_thread = None
+        self.selector = None
+        self.clients = set()  # ClientConnection objects; only the server thread adds or removes
+        # Commands waiting for the main thread, kept per client and drained round-robin
+        self.queue_lock = threading.Lock()
+        self.ready_clients = collections.deque()  # Clients with at least one queued command
+        self.queue_depth = 0
+        self.drain_scheduled = False
+        self.tasks = collections.deque()  # SlicedTasks in progress, main thread only
+        # Lets other threads interrupt the server thread's select()
+        self._wakeup_recv = None
+        self._wakeup_send = None
+        # Commands available with the current integration settings: name -> (handler, spec).
+        # Rebuilt on the main thread after invalidate_command_table() or a scene switch.
+        self._command_table = None
+        self._command_table_scene = None
+        # Integration settings captured with the table, so worker threads never read bpy
+        self.settings = {}
+        self.enabled_integrations = frozenset()
+        self.executor = None
+        self.download_executor = None
+        # execute_code state, main thread only: compiled sources by hash (LRU),
+        # per-session globals (LRU) and named helpers
+        self.code_cache = collections.OrderedDict()
+        self.namespaces = collections.OrderedDict()
+        self.helpers = {}
+        # The command each thread is running, for events tied to it (see emit), and every
+        # running command by (client, request ID) with its start time, for heartbeats
+        self._request_context = threading.local()
+        self.running_commands = {}
+        self._last_heartbeat = 0.0
+        # Shared memory blocks handed to local clients by name, oldest first
+        self.shared_lock = threading.Lock()
+        self.shared_buffers = collections.OrderedDict()
+        # Offscreen buffer viewport captures render into, reused while the size stays the same
+        self._offscreen = None
+        # Encoded captures by fingerprint (see _capture_fingerprint), least recently used first
+        self.capture_cache = collections.OrderedDict()
+        # Results of cacheable commands by (type, params) with the time they were made,
+        # least recently used first; filled from worker threads
+        self.response_lock = threading.Lock()
+        self.response_cache = collections.OrderedDict()
+        self.streams = {}  # client -> its ViewportStream, main thread only
     
     def start(self):
         if self.running:
@@ -52,7 +1121,20 @@ class BlenderMCPServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            self.socket.listen(LISTEN_BACKLOG)
+            self.socket.setblocking(False)
+            
+            self._wakeup_recv, self._wakeup_send = socket.socketpair()
+            self._wakeup_recv.setblocking(False)
+            self._wakeup_send.setblocking(False)
+            
+            self.executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="blendermcp")
+            self.download_executor = ThreadPoolExecutor(max_workers=DOWNLOAD_THREADS,
+                                                        thread_name_prefix="blendermcp-download")
+            self._get_command_table()  # Built here, on the main thread, so routing works from the start
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ, "accept")
+            self.selector.register(self._wakeup_recv, selectors.EVENT_READ, "wakeup")
             
             # Start server thread
             self.server_thread = threading.Thread(target=self._server_loop)
@@ -66,16 +1148,9 @@ class BlenderMCPServer:
             
     def stop(self):
         self.running = False
+        self._wakeup()
         
-        # Close socket
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
-        
-        # Wait for thread to finish
+        # Wait for thread to finish; it closes every socket on its way out
         if self.server_thread:
             try:
                 if self.server_thread.is_alive():
@@ -84,167 +1159,518 @@ class BlenderMCPServer:
                 pass
             self.server_thread = None
         
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.download_executor:
+            self.download_executor.shutdown(wait=False)
+            self.download_executor = None
+        self._close_sockets()
+        for task in self.tasks:
+            task.generator.close()
+        self.tasks.clear()
+        for stream in self.streams.values():
+            stream.active = False  # Its timer unregisters itself on the next tick
+        self.streams.clear()
+        if self._offscreen is not None:
+            with suppress(Exception):
+                self._offscreen.free()
+            self._offscreen = None
+        with self.shared_lock:
+            for block in self.shared_buffers.values():
+                self._free_shared_buffer(block)
+            self.shared_buffers.clear()
         logger.info("BlenderMCP server stopped")
+
+    def _close_sockets(self):
+        for client in list(self.clients):
+            self._close_client(client)
+        for sock in (self.socket, self._wakeup_recv, self._wakeup_send):
+            if sock:
+                with suppress(Exception):
+                    sock.close()
+        if self.selector:
+            with suppress(Exception):
+                self.selector.close()
+        self.socket = self._wakeup_recv = self._wakeup_send = self.selector = None
+
+    def _wakeup(self):
+        """Interrupt select() so the server thread picks up new output or freed queue space"""
+        if self._wakeup_send:
+            with suppress(BlockingIOError, OSError):
+                self._wakeup_send.send(b'\0')
     
     def _server_loop(self):
-        """Main server loop in a separate thread"""
+        """Accept clients and multiplex all their I/O from a single thread"""
         logger.info("Server thread started")
-        self.socket.settimeout(1.0)  # Timeout to allow for stopping
         
-        while self.running:
+        try:
+            while self.running:
+                for key, events in self.selector.select(timeout=1.0):
+                    if key.data == "accept":
+                        self._accept_clients()
+                    elif key.data == "wakeup":
+                        with suppress(BlockingIOError):
+                            while self._wakeup_recv.recv(4096):
+                                pass
+                    else:
+                        self._service_client(key.data, events)
+                self._send_heartbeats()
+                self._update_interest()
+        except Exception as e:
+            if self.running:
+                logger.info(f"Error in server loop: {str(e)}")
+                traceback.print_exc()
+        finally:
+            self._close_sockets()
+        
+        logger.info("Server thread stopped")
+
+    def _send_heartbeats(self):
+        """Tell clients their long-running commands are still going, so they don't time out"""
+        now = time.monotonic()
+        if now - self._last_heartbeat < RUNNING_HEARTBEAT_INTERVAL:
+            return
+        self._last_heartbeat = now
+        with self.queue_lock:
+            running = list(self.running_commands.items())
+        for (client, request_id), started in running:
+            if now - started >= RUNNING_HEARTBEAT_INTERVAL and client.framed and request_id is not None:
+                client.send({"event": "running", "id": request_id, "result": {"elapsed": round(now - started, 1)}})
+
+    def _accept_clients(self):
+        while True:
             try:
-                # Accept new connection
-                try:
-                    client, address = self.socket.accept()
-                    logger.info(f"Connected to client: {address}")
-                    
-                    # Handle client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client,)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    # Just check running condition
-                    continue
-                except Exception as e:
-                    logger.info(f"Error accepting connection: {str(e)}")
-                    time.sleep(0.5)
+                sock, address = self.socket.accept()
+            except BlockingIOError:
+                return
             except Exception as e:
-                logger.info(f"Error in server loop: {str(e)}")
-                if not self.running:
+                logger.info(f"Error accepting connection: {str(e)}")
+                return
+            logger.info(f"Connected to client: {address}")
+            sock.setblocking(False)
+            with suppress(Exception):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = ClientConnection(sock, address)
+            self.clients.add(client)
+            self.selector.register(sock, selectors.EVENT_READ, client)
+
+    def _service_client(self, client, events):
+        try:
+            if events & selectors.EVENT_READ:
+                for command in client.read_messages():
+                    self._handle_message(client, command)
+            if events & selectors.EVENT_WRITE:
+                client.flush()
+        except Exception as e:
+            logger.info(f"Client {client.address} disconnected: {str(e)}")
+            self._close_client(client)
+
+    def _handle_message(self, client, command):
+        logger.info(f"Parsed command: {command.get('type')}")
+        if command.get("type") == NEGOTIATE_COMMAND:
+            # Answered from this thread: it needs no bpy access
+            response = self._negotiate_protocol(command.get("params", {}))
+            if "id" in command:
+                response["id"] = command["id"]
+            client.send(response)  # Still in the legacy format the client asked in
+            client.protocol_version = response["result"]["version"]
+            client.framed = bool(client.protocol_version)
+            return
+        
+        # Commands that never touch bpy skip the main-thread queue entirely, and commands
+        # with a network/disk phase keep their place in it but only run once that's done.
+        # Routed on the static registry: the dispatch table is None while it's being rebuilt
+        spec = self.command_registry.get(command.get("type"))
+        if (spec is not None and self.executor and (not spec.main_thread or spec.prepare)
+                and (spec.integration is None or spec.integration in self.enabled_integrations)):
+            entry = (getattr(self, spec.method), spec)
+            if not spec.main_thread:
+                self.executor.submit(self._run_off_main_thread, client, command, entry)
+                return
+            if spec.prepare:
+                queued = QueuedCommand(command, ready=False)
+                if self._enqueue(client, queued):
+                    self.executor.submit(self._prepare_command, client, queued, entry)
+                return
+        self._schedule_command(client, command)
+
+    def _run_off_main_thread(self, client, command, entry):
+        self._run_command(client, command, entry)
+        self._wakeup()
+
+    def _prepare_command(self, client, queued, entry):
+        """Worker thread: run a command's network/disk phase, then release its bpy phase"""
+        handler, spec = entry
+        command = queued.command
+        self._request_context.current = (client, command)  # So downloads can report progress
+        try:
+            logger.info(f"Preparing {spec.name} off the main thread")
+            prepared = getattr(self, spec.prepare)(**command.get("params", {}))
+        except Exception as e:
+            logger.info(f"Error preparing {spec.name}: {str(e)}")
+            traceback.print_exc()
+            self._respond(client, command, {"status": "error", "message": str(e)})
+            prepared = None
+        finally:
+            self._request_context.current = None
+        if prepared is not None and "error" in prepared:
+            self._respond(client, command, {"status": "success", "result": prepared})
+            prepared = None
+        self._finish_preparing(client, queued, prepared)
+
+    def _finish_preparing(self, client, queued, prepared):
+        """
+        Mark a queued command's prepare phase done, or drop the command when it failed
+        (``prepared`` is None), and let the client's queue move on if it was at the front.
+        """
+        with self.queue_lock:
+            if client.closed:
+                dropped = True  # _close_client already emptied the queue
+            else:
+                dropped = False
+                at_front = client.commands[0] is queued
+                if prepared is None:
+                    client.commands.remove(queued)
+                    self.queue_depth -= 1
+                else:
+                    queued.prepared, queued.ready = prepared, True
+                if at_front and client.commands and client.commands[0].ready:
+                    self.ready_clients.append(client)
+                start_drain = bool(self.ready_clients) and not self.drain_scheduled
+                if start_drain:
+                    self.drain_scheduled = True
+        if dropped:
+            self._discard_prepared(prepared)
+        elif start_drain:
+            bpy.app.timers.register(self._drain_commands, first_interval=0.0)
+        self._wakeup()
+
+    @staticmethod
+    def _discard_prepared(prepared):
+        """Delete the temporary files of a prepared command that will never run"""
+        if not prepared:
+            return
+        if prepared.get("temp_dir"):
+            shutil.rmtree(prepared["temp_dir"], ignore_errors=True)
+        if prepared.get("temporary") and prepared.get("path"):
+            with suppress(OSError):
+                os.remove(prepared["path"])
+
+    def _update_interest(self):
+        """Read only from clients with queue space; watch for writability only with output pending"""
+        with self.queue_lock:
+            queue_full = self.queue_depth >= MAX_QUEUED_COMMANDS
+        for client in list(self.clients):
+            events = 0
+            if not queue_full and len(client.commands) < MAX_QUEUED_PER_CLIENT:
+                events |= selectors.EVENT_READ
+            try:
+                # Write straight away; only wait for writability if the socket buffer is full
+                if client.outgoing and client.flush():
+                    events |= selectors.EVENT_WRITE
+                key = self.selector.get_key(client.sock)
+                if events == 0:
+                    self.selector.unregister(client.sock)
+                elif key.events != events:
+                    self.selector.modify(client.sock, events, client)
+            except KeyError:
+                if events:
+                    self.selector.register(client.sock, events, client)
+            except Exception as e:
+                logger.info(f"Client {client.address} disconnected: {str(e)}")
+                self._close_client(client)
+
+    def _close_client(self, client):
+        with client.lock:
+            client.closed = True
+            client.outgoing.clear()
+        with self.queue_lock:
+            # Drop its queued commands; nobody is left to read the responses
+            dropped = list(client.commands)
+            self.queue_depth -= len(client.commands)
+            client.commands.clear()
+            with suppress(ValueError):
+                self.ready_clients.remove(client)
+        for queued in dropped:
+            self._discard_prepared(queued.prepared)
+        self.clients.discard(client)
+        if self.selector:
+            with suppress(Exception):
+                self.selector.unregister(client.sock)
+        with suppress(Exception):
+            client.sock.close()
+        logger.info("Client handler stopped")
+
+    @staticmethod
+    def _negotiate_protocol(params):
+        """Pick the highest framed protocol version both sides support (0 = legacy JSON)"""
+        offered = [v for v in params.get("versions", []) if isinstance(v, int)]
+        supported = [v for v in offered if v <= PROTOCOL_VERSION]
+        return {"status": "success", "result": {"version": max(supported, default=0)}}
+
+    def broadcast_event(self, event, result):
+        """Push an unsolicited message (no request ID) to every framed client"""
+        message = {"event": event, "result": result}
+        for client in list(self.clients):
+            if client.framed:
+                client.send(message)
+        self._wakeup()
+
+    def _schedule_command(self, client, command, prepared=None):
+        """Queue a command for Blender's main thread, waking the drain timer if needed"""
+        if not self._enqueue(client, QueuedCommand(command, prepared)):
+            self._discard_prepared(prepared)
+
+    def _enqueue(self, client, queued):
+        """
+        Append to a client's queue; False if the client is gone. A client is in
+        ready_clients exactly while the command at the front of its queue is ready.
+        """
+        with self.queue_lock:
+            if client.closed:
+                return False
+            if not client.commands and queued.ready:
+                self.ready_clients.append(client)
+            client.commands.append(queued)
+            self.queue_depth += 1
+            if not queued.ready or self.drain_scheduled:
+                return True
+            self.drain_scheduled = True
+        
+        # Schedule execution in main thread
+        bpy.app.timers.register(self._drain_commands, first_interval=0.0)
+        return True
+
+    def _drain_commands(self):
+        """
+        Timer callback: run queued commands in one main-thread tick.
+
+        Clients are served round-robin, one command each per turn, so a client that
+        queued a long burst can't starve the others. At most MAX_COMMANDS_PER_TICK run
+        per tick, and none start once the tick budget (the blendermcp_tick_budget
+        setting) is spent. Cooperative tasks then get the rest of it, a slice at a time.
+        Whatever is left runs on the next tick.
+        """
+        budget = getattr(bpy.context.scene, "blendermcp_tick_budget", DEFAULT_TICK_BUDGET)
+        deadline = time.perf_counter() + budget / 1000.0
+        processed = 0
+        while True:
+            with self.queue_lock:
+                if not self.ready_clients:
                     break
-                time.sleep(0.5)
+                if processed >= MAX_COMMANDS_PER_TICK or (processed and time.perf_counter() >= deadline):
+                    break
+                client = self.ready_clients.popleft()
+                queued = client.commands.popleft()
+                self.queue_depth -= 1
+                if client.commands and client.commands[0].ready:
+                    self.ready_clients.append(client)
+            self._run_command(client, queued.command, prepared=queued.prepared)
+            processed += 1
         
-        logger.info("Server thread stopped")
-    
-    def _handle_client(self, client):
-        """Handle connected client"""
-        logger.info("Client handler started")
-        client.settimeout(None)  # No timeout
-        # client.settimeout(5.0)  # Set a timeout for receiving data
+        if self.tasks:
+            self._run_slices(deadline)
+        with self.queue_lock:
+            self.drain_scheduled = bool(self.ready_clients or self.tasks)
+            pending = self.drain_scheduled
+        
+        if processed > 1:
+            logger.info(f"Drained {processed} queued commands")
+        # Flush the responses and resume reading from clients that were paused
+        self._wakeup()
+        return 0.0 if pending else None
+
+    def _run_slices(self, deadline):
+        """Advance cooperative tasks round-robin until the deadline, at least one slice per tick"""
+        ran = False
+        while self.tasks and (not ran or time.perf_counter() < deadline):
+            task = self.tasks.popleft()
+            key = (task.client, task.command.get("id"))
+            if task.client.closed:
+                task.generator.close()
+                with self.queue_lock:
+                    self.running_commands.pop(key, None)
+                continue
+            ran = True
+            self._request_context.current = (task.client, task.command)
+            try:
+                task.step()
+            except StopIteration as stop:
+                response = {"status": "success", "result": stop.value}
+            except Exception as e:
+                logger.info(f"Error in cooperative command: {str(e)}")
+                traceback.print_exc()
+                response = {"status": "error", "message": str(e)}
+            else:
+                self.tasks.append(task)
+                continue
+            finally:
+                self._request_context.current = None
+            response["slices"] = task.timing()
+            logger.info(f"{task.command.get('type')} finished after {task.slices} slices")
+            with self.queue_lock:
+                self.running_commands.pop(key, None)
+            self._respond(task.client, task.command, response)
+
+    def _run_command(self, client, command, entry=None, prepared=None):
+        """Execute a command and send the response back"""
+        key = (client, command.get("id"))
+        with self.queue_lock:
+            self.running_commands[key] = time.monotonic()
+        self._request_context.current = (client, command)
+        try:
+            response = self.execute_command(command, entry, prepared)
+        except Exception as e:
+            logger.info(f"Error executing command: {str(e)}")
+            traceback.print_exc()
+            response = {
+                "status": "error",
+                "message": str(e)
+            }
+        finally:
+            self._request_context.current = None
+        if isinstance(response.get("result"), types.GeneratorType):
+            # A cooperative handler: _drain_commands runs it a slice at a time from now on
+            self.tasks.append(SlicedTask(client, command, response["result"]))
+            return
+        with self.queue_lock:
+            self.running_commands.pop(key, None)
+        self._respond(client, command, response)
+
+    def emit(self, event, result, context=None):
+        """
+        Send an event about the command this thread is running (e.g. output or progress)
+        to the client that sent it. Only framed clients get them, since legacy clients
+        expect nothing but the response. Threads working on another thread's behalf pass
+        its ``context``.
+        """
+        client, command = context or getattr(self._request_context, "current", None) or (None, None)
+        if client is None or not client.framed or "id" not in command:
+            return False
+        client.send({"event": event, "id": command["id"], "result": result})
+        self._wakeup()
+        return True
+
+    def report_progress(self, progress, total=None, message=None):
+        """Available to execute_code scripts and helpers as report_progress()"""
+        return self.emit("progress", {"progress": progress, "total": total, "message": message})
+
+    def _download_progress(self, message, sizes=None):
+        """
+        Return a download_file progress callback reporting to the client of this thread's
+        command. With ``sizes`` ({key: size or None}) it takes the key first and reports
+        the total across several concurrent downloads.
+        """
+        context = getattr(self._request_context, "current", None)
+        if sizes is None:
+            return lambda done, total: self.emit(
+                "progress", {"progress": done, "total": total, "message": message}, context
+            )
+        done_by_key = dict.fromkeys(sizes, 0)
+        total = sum(sizes.values()) if None not in sizes.values() else None
+
+        def report(key, done, _total):
+            done_by_key[key] = done
+            self.emit("progress", {"progress": sum(done_by_key.values()), "total": total, "message": message}, context)
+        return report
+
+    def _respond(self, client, command, response):
+        """Send a response, tagged with the ID of the command it answers"""
+        if "id" in command:
+            response["id"] = command["id"]
+        attachments = ()
+        if isinstance(response.get("result"), BinaryResult):
+            response["result"], attachments = response["result"].result, response["result"].buffers
+        client.processed += 1
+        if not client.send(response, attachments):
+            logger.info("Failed to send response - client disconnected")
+
+    @command(main_thread=False)
+    def get_server_stats(self):
+        """Connected clients and main-thread queue depth, for monitoring and load balancing"""
+        with self.queue_lock:
+            return {
+                "clients": [
+                    {
+                        "address": f"{client.address[0]}:{client.address[1]}",
+                        "framed": client.framed,
+                        "queued": len(client.commands),
+                        "processed": client.processed,
+                    }
+                    for client in list(self.clients)
+                ],
+                "queue_depth": self.queue_depth,
+                "viewport_streams": len(self.streams),
+                "cooperative_tasks": [
+                    dict(task.timing(), type=task.command.get("type")) for task in list(self.tasks)
+                ],
+                "max_queue_depth": MAX_QUEUED_COMMANDS,
+            }
 
-        buffer = b''
-        
-        try:
-            while self.running:
-                # Receive data
-                try:
-                    data = client.recv(8192)
-                    if not data:
-                        logger.info("Client disconnected")
-                        break
-                    logger.info(f"Accepted {len((data))} bytes from client")
-                    
-                    buffer += data
-                    try:
-                        # Try to parse command
-                        command = json.loads(buffer.decode('utf-8'))
-                        buffer = b''
-                        logger.info(f"Parsed command: {command}" )
-                        
-                        # Execute command in Blender's main thread
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    logger.info("Failed to send response - client disconnected")
-                            except Exception as e:
-                                logger.info(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
-                            return None
-                        
-                        # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                    except json.JSONDecodeError:
-                        # Incomplete data, wait for more
-                        pass
-                except Exception as e:
-                    logger.info(f"Error receiving data: {str(e)}")
-                    break
-        except Exception as e:
-            logger.info(f"Error in client handler: {str(e)}")
-        finally:
-            try:
-                client.close()
-            except:
-                pass
-            logger.info("Client handler stopped")
+    def invalidate_command_table(self):
+        """Forget the dispatch table; called when an integration setting changes"""
+        self._command_table = None
+        with self.response_lock:
+            self.response_cache.clear()  # e.g. results fetched with an old API key
+
+    def _get_command_table(self):
+        """The dispatch table for the current scene's settings, rebuilt only when stale"""
+        scene = bpy.context.scene
+        scene_key = scene.as_pointer()
+        if self._command_table is None or self._command_table_scene != scene_key:
+            table = {}
+            self.enabled_integrations = frozenset(
+                integration for integration, prop in INTEGRATION_PROPERTIES.items() if getattr(scene, prop)
+            )
+            for spec in self.command_registry.values():
+                if spec.integration and not getattr(scene, INTEGRATION_PROPERTIES[spec.integration]):
+                    continue
+                table[spec.name] = (getattr(self, spec.method), spec)
+            self.settings = {
+                "use_sketchfab": scene.blendermcp_use_sketchfab,
+                "hyper3d_mode": scene.blendermcp_hyper3d_mode,
+                "hyper3d_api_key": scene.blendermcp_hyper3d_api_key,
+                "sketchfab_api_key": scene.blendermcp_sketchfab_api_key,
+            }
+            self._command_table_scene = scene_key
+            self._command_table = table
+        return self._command_table
 
-    def execute_command(self, command):
+    def execute_command(self, command, entry=None, prepared=None):
         """Execute a command in the main Blender thread"""
         try:            
-            return self._execute_command_internal(command)
+            return self._execute_command_internal(command, entry, prepared)
                 
         except Exception as e:
             logger.info(f"Error executing command: {str(e)}")
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
-    def _execute_command_internal(self, command):
+    def _execute_command_internal(self, command, entry=None, prepared=None):
         """Internal command execution with proper context"""
         cmd_type = command.get("type")
         params = command.get("params", {})
+        if "attachments" in command:
+            params = _resolve_attachments(params, command["attachments"])
+        if prepared is not None:
+            params = dict(params, prepared=prepared)
 
-        # Add a handler for checking PolyHaven status
-        if cmd_type == "get_polyhaven_status":
-            return {"status": "success", "result": self.get_polyhaven_status()}
-        
-        # Base handlers that are always available
-        handlers = {
-            "get_scene_info": self.get_scene_info,
-            "get_object_info": self.get_object_info,
-            "get_viewport_screenshot": self.get_viewport_screenshot,
-            "execute_code": self.execute_code,
-            "get_polyhaven_status": self.get_polyhaven_status,
-            "get_hyper3d_status": self.get_hyper3d_status,
-            "get_sketchfab_status": self.get_sketchfab_status,
-        }
-        
-        # Add Polyhaven handlers only if enabled
-        if bpy.context.scene.blendermcp_use_polyhaven:
-            polyhaven_handlers = {
-                "get_polyhaven_categories": self.get_polyhaven_categories,
-                "search_polyhaven_assets": self.search_polyhaven_assets,
-                "download_polyhaven_asset": self.download_polyhaven_asset,
-                "set_texture": self.set_texture,
-            }
-            handlers.update(polyhaven_handlers)
-        
-        # Add Hyper3d handlers only if enabled
-        if bpy.context.scene.blendermcp_use_hyper3d:
-            polyhaven_handlers = {
-                "create_rodin_job": self.create_rodin_job,
-                "poll_rodin_job_status": self.poll_rodin_job_status,
-                "import_generated_asset": self.import_generated_asset,
-            }
-            handlers.update(polyhaven_handlers)
-            
-        # Add Sketchfab handlers only if enabled
-        if bpy.context.scene.blendermcp_use_sketchfab:
-            sketchfab_handlers = {
-                "search_sketchfab_models": self.search_sketchfab_models,
-                "download_sketchfab_model": self.download_sketchfab_model,
-            }
-            handlers.update(sketchfab_handlers)
-
-        handler = handlers.get(cmd_type)
-        if handler:
+        # Off the main thread the caller has already looked the handler up
+        if entry is None:
+            entry = self._get_command_table().get(cmd_type)
+        if entry:
+            handler, spec = entry
+            if spec.prepare and prepared is None:
+                # Only when the integration was switched on after the IO thread routed it;
+                # running the network phase here would block Blender's UI
+                return {"status": "error", "message": f"{cmd_type} wasn't prepared, please send it again"}
             try:
                 logger.info(f"Executing handler for {cmd_type}")
-                result = handler(**params)
+                if spec.cacheable:
+                    result = self._call_cached(cmd_type, handler, params)
+                else:
+                    result = handler(**params)
                 logger.info(f"Handler execution complete")
                 return {"status": "success", "result": result}
             except Exception as e:
@@ -254,42 +1680,163 @@ class BlenderMCPServer:
         else:
             return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
 
-    
-    
-    def get_scene_info(self):
-        """Get information about the current Blender scene"""
+    def _call_cached(self, cmd_type, handler, params):
+        """Run a cacheable handler, or reuse its result for the same params if still fresh"""
+        key = (cmd_type, json.dumps(params, sort_keys=True))
+        now = time.monotonic()
+        with self.response_lock:
+            cached = self.response_cache.get(key)
+            if cached is not None and now - cached[0] < RESPONSE_CACHE_TTL:
+                self.response_cache.move_to_end(key)
+                return cached[1]
+        result = handler(**params)
+        if not (isinstance(result, dict) and "error" in result):
+            with self.response_lock:
+                self.response_cache[key] = (now, result)
+                self.response_cache.move_to_end(key)
+                if len(self.response_cache) > MAX_CACHED_RESPONSES:
+                    self.response_cache.popitem(last=False)
+        return result
+
+    # Per-object fields get_scene_info can project; "transforms" is shorthand for
+    # location, rotation and scale
+    SCENE_INFO_FIELDS = {
+        "name": lambda self, obj: obj.name,
+        "type": lambda self, obj: obj.type,
+        "location": lambda self, obj: _round_vector(obj.location),
+        "rotation": lambda self, obj: _round_vector(obj.rotation_euler),
+        "scale": lambda self, obj: _round_vector(obj.scale),
+        "dimensions": lambda self, obj: _round_vector(obj.dimensions),
+        "bbox": lambda self, obj: (
+            [_round_vector(corner) for corner in self._get_aabb(obj)] if obj.type == 'MESH' else None
+        ),
+        "materials": lambda self, obj: [slot.material.name for slot in obj.material_slots if slot.material],
+        "collection": lambda self, obj: [collection.name for collection in obj.users_collection],
+        "parent": lambda self, obj: obj.parent.name if obj.parent else None,
+        "modifiers": lambda self, obj: [modifier.type for modifier in obj.modifiers],
+        "visible": lambda self, obj: obj.visible_get(),
+    }
+    FIELD_GROUPS = {"transforms": ("location", "rotation", "scale")}
+
+    @command()
+    def get_scene_info(self, cursor=None, limit=SCENE_INFO_PAGE_SIZE, fields=None, types=None,
+                       collection=None, name_pattern=None, layout="rows"):
+        """
+        Get information about the current Blender scene, one page of objects at a time.
+
+        Objects are ordered by name. `cursor` is the `next_cursor` of the previous page;
+        `fields`, `types` accept lists or comma-separated strings; `name_pattern` is a glob.
+        layout="columns" returns {"fields": [...], "columns": {field: [values]}} instead of
+        a list of per-object dicts, which avoids repeating every key for every object.
+        """
         try:
             logger.info("Getting scene info...")
-            # Simplify the scene info to reduce data size
+            scene = bpy.context.scene
+            fields = self._scene_info_fields(fields)
+            limit = max(1, min(int(limit or SCENE_INFO_PAGE_SIZE), MAX_SCENE_INFO_PAGE_SIZE))
+            if layout not in ("rows", "columns"):
+                raise ValueError(f"Unknown layout: {layout}. Use 'rows' or 'columns'")
+
+            # Narrow down by collection first, it's the cheapest filter
+            if collection:
+                source = bpy.data.collections.get(collection)
+                if source is None:
+                    raise ValueError(f"Collection not found: {collection}")
+                scene_objects = set(scene.objects)
+                objects = [obj for obj in source.all_objects if obj in scene_objects]
+            else:
+                objects = list(scene.objects)
+            if types:
+                types = {t.upper() for t in _split_list(types)}
+                objects = [obj for obj in objects if obj.type in types]
+            if name_pattern:
+                objects = [obj for obj in objects if fnmatch.fnmatchcase(obj.name, name_pattern)]
+
+            # Name order is stable across calls, and a name cursor stays valid when
+            # objects before it are added or removed
+            objects.sort(key=lambda obj: obj.name)
+            start = bisect.bisect_right([obj.name for obj in objects], cursor) if cursor else 0
+            page = objects[start:start + limit]
+
+            getters = [(field, self.SCENE_INFO_FIELDS[field]) for field in fields]
             scene_info = {
-                "name": bpy.context.scene.name,
-                "object_count": len(bpy.context.scene.objects),
-                "objects": [],
+                "name": scene.name,
+                "object_count": len(scene.objects),
                 "materials_count": len(bpy.data.materials),
+                "matched_count": len(objects),
+                "returned_count": len(page),
+                "next_cursor": page[-1].name if start + limit < len(objects) else None,
             }
-            
-            # Collect minimal object information (limit to first 10 objects)
-            for i, obj in enumerate(bpy.context.scene.objects):
-                if i >= 10:  # Reduced from 20 to 10
-                    break
-                    
-                obj_info = {
-                    "name": obj.name,
-                    "type": obj.type,
-                    # Only include basic location data
-                    "location": [round(float(obj.location.x), 2), 
-                                round(float(obj.location.y), 2), 
-                                round(float(obj.location.z), 2)],
-                }
-                scene_info["objects"].append(obj_info)
-            
-            logger.info(f"Scene info collected: {len(scene_info['objects'])} objects")
+            if layout == "columns":
+                scene_info["fields"] = fields
+                scene_info["columns"] = {field: [get(self, obj) for obj in page] for field, get in getters}
+            else:
+                scene_info["objects"] = [{field: get(self, obj) for field, get in getters} for obj in page]
+
+            logger.info(f"Scene info collected: {len(page)} of {len(objects)} objects")
             return scene_info
         except Exception as e:
             logger.info(f"Error in get_scene_info: {str(e)}")
             traceback.print_exc()
             return {"error": str(e)}
+
+    def _scene_info_fields(self, fields):
+        """Expand and validate a get_scene_info field projection"""
+        if not fields:
+            return list(DEFAULT_SCENE_INFO_FIELDS)
+        expanded = []
+        for field in _split_list(fields):
+            for name in self.FIELD_GROUPS.get(field, (field,)):
+                if name not in self.SCENE_INFO_FIELDS:
+                    known = sorted([*self.SCENE_INFO_FIELDS, *self.FIELD_GROUPS])
+                    raise ValueError(f"Unknown field: {name}. Available fields: {', '.join(known)}")
+                if name not in expanded:
+                    expanded.append(name)
+        return expanded
     
+    @command()
+    def get_scene_changes(self, since_version=0, fields=None, limit=MAX_SCENE_INFO_PAGE_SIZE):
+        """
+        Objects added, removed or modified after `since_version`, with the requested
+        fields of their current state. Pass the returned `version` on the next call.
+        `reset` is true when the log no longer reaches back to `since_version` (or it
+        comes from an earlier session); the caller should then resync with get_scene_info.
+        """
+        try:
+            log = scene_change_log
+            since_version = int(since_version or 0)
+            fields = self._scene_info_fields(fields)
+            limit = max(1, min(int(limit or MAX_SCENE_INFO_PAGE_SIZE), MAX_SCENE_INFO_PAGE_SIZE))
+            if since_version < log.oldest_version or since_version > log.version:
+                return {"version": log.version, "reset": True, "more": False, "changes": []}
+
+            changes = log.since(since_version)
+            more = len(changes) > limit
+            changes = changes[:limit]
+            getters = [(field, self.SCENE_INFO_FIELDS[field]) for field in fields]
+            objects = bpy.context.scene.objects
+            result = []
+            for _, name, kinds in changes:
+                obj = objects.get(name) if "removed" not in kinds else None
+                if obj is None:
+                    result.append({"name": name, "changes": ["removed"]})
+                    continue
+                entry = {field: get(self, obj) for field, get in getters}
+                entry["name"] = name
+                entry["changes"] = sorted(kinds)
+                result.append(entry)
+            return {
+                # Resume from the last change returned when the page was cut short
+                "version": changes[-1][0] if more else log.version,
+                "reset": False,
+                "more": more,
+                "changes": result,
+            }
+        except Exception as e:
+            logger.info(f"Error in get_scene_changes: {str(e)}")
+            traceback.print_exc()
+            return {"error": str(e)}
+
     @staticmethod
     def _get_aabb(obj):
         """ Returns the world-space axis-aligned bounding box (AABB) of an object. """
@@ -312,6 +1859,7 @@ class BlenderMCPServer:
 
 
     
+    @command()
     def get_object_info(self, name):
         """Get detailed information about a specific object"""
         obj = bpy.data.objects.get(name)
@@ -348,132 +1896,874 @@ class BlenderMCPServer:
             }
         
         return obj_info
-    
-    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
+
+    # Generic attribute data types: (foreach_get property, dtype, components per element)
+    ATTRIBUTE_LAYOUTS = {
+        "FLOAT": ("value", np.float32, 1),
+        "INT": ("value", np.int32, 1),
+        "INT8": ("value", np.int32, 1),
+        "BOOLEAN": ("value", np.bool_, 1),
+        "FLOAT2": ("vector", np.float32, 2),
+        "INT32_2D": ("value", np.int32, 2),
+        "FLOAT_VECTOR": ("vector", np.float32, 3),
+        "FLOAT_COLOR": ("color", np.float32, 4),
+        "BYTE_COLOR": ("color", np.float32, 4),
+        "QUATERNION": ("value", np.float32, 4),
+    }
+    DEFAULT_MESH_ARRAYS = ("positions", "indices", "face_sizes")
+
+    @staticmethod
+    def _foreach_get(collection, prop, dtype, components):
+        array = np.empty(len(collection) * components, dtype=dtype)
+        collection.foreach_get(prop, array)
+        return array.reshape(-1, components) if components > 1 else array
+
+    def _mesh_array(self, mesh, name):
+        """Read one array from ``mesh`` with a single foreach_get call"""
+        if name == "positions":
+            return self._foreach_get(mesh.vertices, "co", np.float32, 3)
+        if name == "normals":
+            # Blender 4.1 moved normals out of MeshVertex
+            if hasattr(mesh, "vertex_normals"):
+                return self._foreach_get(mesh.vertex_normals, "vector", np.float32, 3)
+            return self._foreach_get(mesh.vertices, "normal", np.float32, 3)
+        if name == "edges":
+            return self._foreach_get(mesh.edges, "vertices", np.int32, 2)
+        if name == "indices":
+            # Vertex index of every face corner; face_sizes says how many belong to each face
+            return self._foreach_get(mesh.loops, "vertex_index", np.int32, 1)
+        if name == "face_sizes":
+            return self._foreach_get(mesh.polygons, "loop_total", np.int32, 1)
+        if name == "triangles":
+            mesh.calc_loop_triangles()
+            return self._foreach_get(mesh.loop_triangles, "vertices", np.int32, 3)
+        if name == "uvs":
+            if not mesh.uv_layers.active:
+                raise ValueError(f"Mesh {mesh.name} has no UV map")
+            return self._foreach_get(mesh.uv_layers.active.data, "uv", np.float32, 2)
+        attribute = mesh.attributes.get(name)
+        if attribute is None:
+            raise ValueError(f"Unknown mesh array or attribute: {name}")
+        if attribute.data_type not in self.ATTRIBUTE_LAYOUTS:
+            raise ValueError(f"Unsupported attribute type {attribute.data_type} for {name}")
+        prop, dtype, components = self.ATTRIBUTE_LAYOUTS[attribute.data_type]
+        return self._foreach_get(attribute.data, prop, dtype, components)
+
+    @command()
+    def get_mesh_data(self, name, arrays=None, evaluated=False, world_space=False, transport="attachments"):
         """
-        Capture a screenshot of the current 3D viewport and save it to the specified path.
-        
-        Parameters:
-        - max_size: Maximum size in pixels for the largest dimension of the image
-        - filepath: Path where to save the screenshot file
-        - format: Image format (png, jpg, etc.)
-        
-        Returns success/error status
+        Bulk mesh data as little-endian binary arrays, read with foreach_get.
+
+        ``arrays`` names any of positions, normals, edges, indices, face_sizes, triangles,
+        uvs or a mesh attribute (list or comma-separated; default positions, indices,
+        face_sizes). With transport="attachments" the arrays are frame attachments and
+        each array's "attachment" is its index. With transport="shared_memory" (local
+        clients only) they are copied into one shared memory block; each array has an
+        "offset", and the client calls release_shared_buffer once it has read them.
         """
+        obj = bpy.data.objects.get(name)
+        if not obj:
+            raise ValueError(f"Object not found: {name}")
+        if obj.type != 'MESH':
+            raise ValueError(f"Object {name} is not a mesh")
+        if transport not in ("attachments", "shared_memory"):
+            raise ValueError(f"Unknown transport: {transport}")
+        names = _split_list(arrays) if arrays else list(self.DEFAULT_MESH_ARRAYS)
+
+        # The evaluated mesh includes modifiers and must be freed with to_mesh_clear()
+        source = obj.evaluated_get(bpy.context.evaluated_depsgraph_get()) if evaluated else obj
+        mesh = source.to_mesh() if evaluated else obj.data
         try:
-            if not filepath:
-                return {"error": "No filepath provided"}
-            
-            # Find the active 3D viewport
-            area = None
-            for a in bpy.context.screen.areas:
-                if a.type == 'VIEW_3D':
-                    area = a
-                    break
-            
-            if not area:
-                return {"error": "No 3D viewport found"}
-            
-            # Take screenshot with proper context override
-            with bpy.context.temp_override(area=area):
-                bpy.ops.screen.screenshot_area(filepath=filepath)
-            
-            # Load and resize if needed
-            img = bpy.data.images.load(filepath)
-            width, height = img.size
-            
-            if max(width, height) > max_size:
-                scale = max_size / max(width, height)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                img.scale(new_width, new_height)
-                
-                # Set format and save
-                img.file_format = format.upper()
-                img.save()
-                width, height = new_width, new_height
-            
-            # Cleanup Blender image data
-            bpy.data.images.remove(img)
-            
-            return {
-                "success": True,
-                "width": width,
-                "height": height,
-                "filepath": filepath
+            data = {array_name: self._mesh_array(mesh, array_name) for array_name in names}
+            if world_space and "positions" in data:
+                matrix = np.array(obj.matrix_world, dtype=np.float32)
+                data["positions"] = data["positions"] @ matrix[:3, :3].T + matrix[:3, 3]
+            result = {
+                "name": obj.name,
+                "vertex_count": len(mesh.vertices),
+                "edge_count": len(mesh.edges),
+                "polygon_count": len(mesh.polygons),
+                "loop_count": len(mesh.loops),
+                "arrays": {},
             }
-            
+        finally:
+            if evaluated:
+                source.to_mesh_clear()
+
+        buffers = []
+        for array_name, array in data.items():
+            array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+            result["arrays"][array_name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+            buffers.append(array)
+
+        if transport == "shared_memory":
+            return self._share_buffers(result, buffers)
+        for index, array_name in enumerate(data):
+            result["arrays"][array_name]["attachment"] = index
+        return BinaryResult(result, buffers)
+
+    def _share_buffers(self, result, buffers):
+        """Copy arrays into one shared memory block that the local client releases when done"""
+        offsets = []
+        size = 0
+        for array in buffers:
+            offsets.append(size)
+            size += (array.nbytes + 15) & ~15  # Keep every array 16-byte aligned
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for offset, array, meta in zip(offsets, buffers, result["arrays"].values()):
+            block.buf[offset:offset + array.nbytes] = array.reshape(-1).view(np.uint8)
+            meta["offset"] = offset
+        with self.shared_lock:
+            self.shared_buffers[block.name] = block
+            while len(self.shared_buffers) > MAX_SHARED_BUFFERS:
+                # A client that never released its block; don't let them pile up
+                self._free_shared_buffer(self.shared_buffers.popitem(last=False)[1])
+        result["shared_memory"] = {"name": block.name, "size": size}
+        return result
+
+    @staticmethod
+    def _free_shared_buffer(block):
+        with suppress(Exception):
+            block.close()
+            block.unlink()
+
+    @command(main_thread=False)
+    def release_shared_buffer(self, name):
+        """Free a shared memory block once the client has copied its arrays out"""
+        with self.shared_lock:
+            block = self.shared_buffers.pop(name, None)
+        if block is None:
+            return {"released": False}
+        self._free_shared_buffer(block)
+        return {"released": True}
+
+    @staticmethod
+    def _as_array(value, dtype, components=None, name="array"):
+        """An array param, sent as an attachment or as a (nested) JSON list"""
+        array = np.ascontiguousarray(value, dtype=dtype)
+        if components:
+            if array.size % components:
+                raise ValueError(f"{name} must have {components} values per element")
+            array = array.reshape(-1, components)
+        return array
+
+    @staticmethod
+    def _target_collection(name):
+        if not name:
+            return bpy.context.scene.collection
+        collection = bpy.data.collections.get(name)
+        if collection is None:
+            raise ValueError(f"Collection not found: {name}")
+        return collection
+
+    @command()
+    def create_mesh_from_buffers(self, name, positions, indices=None, face_sizes=None, triangles=None,
+                                 edges=None, uvs=None, location=(0, 0, 0), rotation=(0, 0, 0), scale=(1, 1, 1),
+                                 collection=None):
+        """
+        Build a mesh object straight from arrays with foreach_set, no operators involved.
+
+        Faces are either ``indices`` (vertex index per face corner) with ``face_sizes``,
+        the same layout get_mesh_data returns, or ``triangles`` (n, 3). ``uvs`` has one
+        (u, v) per face corner. The mesh is validated before it's used; "corrected" in the
+        result says whether that had to fix anything (e.g. duplicate faces or edges).
+        """
+        positions = self._as_array(positions, np.float32, 3, "positions")
+        if triangles is not None:
+            indices = self._as_array(triangles, np.int32, 3, "triangles").reshape(-1)
+            face_sizes = np.full(len(indices) // 3, 3, dtype=np.int32)
+        elif indices is not None:
+            indices = self._as_array(indices, np.int32).reshape(-1)
+            if face_sizes is None:
+                raise ValueError("face_sizes is required with indices")
+            face_sizes = self._as_array(face_sizes, np.int32).reshape(-1)
+            if face_sizes.sum() != len(indices):
+                raise ValueError("face_sizes must add up to the number of indices")
+            if len(face_sizes) and face_sizes.min() < 3:
+                raise ValueError("Every face needs at least 3 corners")
+        else:
+            indices = np.empty(0, dtype=np.int32)
+            face_sizes = np.empty(0, dtype=np.int32)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(positions)):
+            raise ValueError("Face indices out of range")
+        if edges is not None:
+            edges = self._as_array(edges, np.int32, 2, "edges")
+            if len(edges) and (edges.min() < 0 or edges.max() >= len(positions)):
+                raise ValueError("Edge indices out of range")
+        if uvs is not None:
+            uvs = self._as_array(uvs, np.float32, 2, "uvs")
+            if len(uvs) != len(indices):
+                raise ValueError("uvs needs one (u, v) per face corner")
+        target = self._target_collection(collection)
+
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(positions))
+        mesh.vertices.foreach_set("co", positions.reshape(-1))
+        if edges is not None:
+            mesh.edges.add(len(edges))
+            mesh.edges.foreach_set("vertices", edges.reshape(-1))
+        mesh.loops.add(len(indices))
+        mesh.loops.foreach_set("vertex_index", indices)
+        mesh.polygons.add(len(face_sizes))
+        loop_starts = np.zeros(len(face_sizes), dtype=np.int32)
+        np.cumsum(face_sizes[:-1], out=loop_starts[1:])
+        mesh.polygons.foreach_set("loop_start", loop_starts)
+        if bpy.app.version < (4, 0, 0):
+            # Derived from loop_start from 4.0 on
+            mesh.polygons.foreach_set("loop_total", face_sizes)
+        if uvs is not None:
+            mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", uvs.reshape(-1))
+        # validate() drops faces whose corners have no edge, so add any ``edges`` left out
+        mesh.update(calc_edges=True)
+        # Bad input (repeated corners, duplicate faces) would otherwise crash later operators
+        corrected = mesh.validate(clean_customdata=False)
+        mesh.update()
+
+        obj = bpy.data.objects.new(name, mesh)
+        obj.location = location
+        obj.rotation_euler = rotation
+        obj.scale = scale
+        target.objects.link(obj)
+        return {
+            "name": obj.name,
+            "mesh": mesh.name,
+            "vertex_count": len(mesh.vertices),
+            "polygon_count": len(mesh.polygons),
+            "corrected": corrected,
+        }
+
+    @command()
+    def instantiate_objects(self, source, locations, rotations=None, scales=None, collection=None,
+                            parent_collection=None, linked=True):
+        """
+        Create one copy of ``source`` per row of ``locations`` (n, 3), optionally with
+        per-instance ``rotations`` (n, 3, Euler radians) and ``scales`` (n, 3 or n).
+
+        The copies go into a new collection (named ``collection``, or after the source)
+        so their transforms can be written with one foreach_set per property. Linked
+        copies share the source's mesh data.
+        """
+        source_obj = bpy.data.objects.get(source)
+        if not source_obj:
+            raise ValueError(f"Object not found: {source}")
+        locations = self._as_array(locations, np.float32, 3, "locations")
+        count = len(locations)
+        if rotations is not None:
+            rotations = self._as_array(rotations, np.float32, 3, "rotations")
+            if len(rotations) != count:
+                raise ValueError("rotations must have one row per location")
+        if scales is not None:
+            scales = self._as_array(scales, np.float32, name="scales")
+            if scales.ndim == 1:
+                scales = np.repeat(scales, 3) if len(scales) == count else scales
+            scales = scales.reshape(-1, 3)
+            if len(scales) != count:
+                raise ValueError("scales must have one value or row per location")
+        parent = self._target_collection(parent_collection)
+
+        target = bpy.data.collections.new(collection or f"{source_obj.name}_instances")
+        parent.children.link(target)
+        data = source_obj.data
+        objects = bpy.data.objects
+        link = target.objects.link
+        for i in range(count):
+            obj = objects.new(f"{source_obj.name}.{i:06d}", data if linked or data is None else data.copy())
+            link(obj)
+
+        # One call per property instead of one per object
+        instances = target.objects
+        instances.foreach_set("location", locations.reshape(-1))
+        instances.foreach_set("rotation_euler",
+                              rotations.reshape(-1) if rotations is not None
+                              else np.tile(np.array(source_obj.rotation_euler, dtype=np.float32), count))
+        instances.foreach_set("scale",
+                              scales.reshape(-1) if scales is not None
+                              else np.tile(np.array(source_obj.scale, dtype=np.float32), count))
+        return {
+            "collection": target.name,
+            "count": count,
+        }
+
+    @staticmethod
+    def _set_path(obj, data_path, value):
+        """Set ``data_path`` (e.g. "location", "data.energy", '["tag"]') on ``obj``"""
+        if data_path.endswith("]") and "[" in data_path:
+            # Custom property, possibly on nested data: 'data["tag"]'
+            owner_path, _, key = data_path[:-1].rpartition("[")
+            owner = obj.path_resolve(owner_path.rstrip(".")) if owner_path else obj
+            owner[json.loads(key)] = value
+            return
+        owner_path, _, attr = data_path.rpartition(".")
+        owner = obj.path_resolve(owner_path) if owner_path else obj
+        if not hasattr(owner, attr):
+            raise AttributeError(f"{owner_path or obj.name} has no property {attr}")
+        setattr(owner, attr, value)
+
+    # Property types foreach_get/foreach_set can read into and write from a NumPy buffer
+    FOREACH_DTYPES = {"FLOAT": np.float32, "INT": np.int32, "BOOLEAN": np.bool_}
+
+    def _set_column(self, objects, data_path, values, index):
+        """
+        Set one property on many objects. Given the objects' ``index`` in bpy.data.objects,
+        plain object properties go through a foreach_get/foreach_set round trip over the
+        whole collection, two calls in total; anything else, or without an index, falls
+        back to setting it object by object.
+        """
+        rows = np.asarray(values).reshape(len(objects), -1)
+        prop = bpy.types.Object.bl_rna.properties.get(data_path)
+        if index is not None and prop is not None and prop.type in self.FOREACH_DTYPES:
+            try:
+                everything = bpy.data.objects
+                buffer = np.empty(len(everything) * rows.shape[1], dtype=self.FOREACH_DTYPES[prop.type])
+                everything.foreach_get(data_path, buffer)
+                buffer = buffer.reshape(len(everything), -1)
+                buffer[[index[obj.name] for obj in objects]] = rows
+                everything.foreach_set(data_path, buffer.reshape(-1))
+                return len(objects)
+            except (TypeError, RuntimeError, ValueError):
+                pass  # e.g. a read-only property; set it one object at a time for a clear error
+        for obj, row in zip(objects, rows):
+            self._set_path(obj, data_path, row.tolist() if len(row) > 1 else row[0].item())
+        return len(objects)
+
+    @command()
+    def set_properties_batch(self, operations=None, objects=None, columns=None):
+        """
+        Apply many property changes in one main-thread tick, with a single view layer update.
+
+        ``operations`` is a list of [object_name, data_path, value]. For columnar edits,
+        ``objects`` lists object names and ``columns`` maps a data path to one value (or
+        row) per object, e.g. {"location": [[x, y, z], ...]}. Columns on plain object
+        properties are written with foreach_set when the objects make up most of the file.
+        Failing operations and missing objects are reported and skipped; the rest are
+        still applied.
+
+        Runs cooperatively, yielding every BATCH_SLICE_SIZE operations and after each
+        column, so a huge batch doesn't hold the main thread past the tick budget.
+        """
+        applied = 0
+        errors = []
+
+        for i, operation in enumerate(operations or []):
+            if i and i % BATCH_SLICE_SIZE == 0:
+                yield
+            try:
+                name, data_path, value = operation
+                obj = bpy.data.objects.get(name)
+                if not obj:
+                    raise ValueError(f"Object not found: {name}")
+                self._set_path(obj, data_path, value)
+                applied += 1
+            except Exception as e:
+                errors.append({"operation": i, "error": str(e)})
+
+        if columns:
+            names = _split_list(objects or [])
+            found, rows = [], []
+            for row, name in enumerate(names):
+                obj = bpy.data.objects.get(name)
+                if obj is None:
+                    errors.append({"object": name, "error": f"Object not found: {name}"})
+                else:
+                    found.append(obj)
+                    rows.append(row)
+            # foreach_set rewrites every object in the file, so it's only worth it (and only
+            # safe) when most of them are targets and none are linked from a library
+            everything = bpy.data.objects
+            index = None
+            if found and not bpy.data.libraries and len(found) >= len(everything) * COLUMN_FOREACH_MIN_SHARE:
+                index = {obj.name: i for i, obj in enumerate(everything)}
+            for data_path, values in columns.items():
+                try:
+                    if len(values) != len(names):
+                        raise ValueError(f"Expected {len(names)} values, got {len(values)}")
+                    if found:
+                        values = [values[row] for row in rows] if len(found) < len(names) else values
+                        applied += self._set_column(found, data_path, values, index)
+                except Exception as e:
+                    errors.append({"column": data_path, "error": str(e)})
+                yield
+
+        # One evaluation for the whole batch instead of one per change
+        bpy.context.view_layer.update()
+        return {
+            "applied": applied,
+            "error_count": len(errors),
+            "errors": errors[:MAX_REPORTED_ERRORS],
+        }
+    
+    @staticmethod
+    def _find_viewport():
+        """The first 3D viewport's area, its main region and its space"""
+        for area in bpy.context.screen.areas if bpy.context.screen else ():
+            if area.type == 'VIEW_3D':
+                for region in area.regions:
+                    if region.type == 'WINDOW':
+                        return area, region, area.spaces.active
+        return None, None, None
+
+    def _render_viewport(self, region, space, width, height):
+        """Draw the viewport into an offscreen buffer and read it back as (height, width, 4) uint8"""
+        offscreen = self._offscreen
+        if offscreen is None or (offscreen.width, offscreen.height) != (width, height):
+            if offscreen is not None:
+                offscreen.free()
+            offscreen = self._offscreen = gpu.types.GPUOffScreen(width, height)
+        region_3d = space.region_3d
+        offscreen.draw_view3d(
+            bpy.context.scene, bpy.context.view_layer, space, region,
+            region_3d.view_matrix, region_3d.window_matrix, do_color_management=True,
+        )
+        with offscreen.bind():
+            buffer = gpu.state.active_framebuffer_get().read_color(0, 0, width, height, 4, 0, 'UBYTE')
+        # OpenGL rows start at the bottom
+        return np.asarray(buffer, dtype=np.uint8).reshape(height, width, 4)[::-1]
+
+    @command()
+    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png", quality=80,
+                                color_mode="rgb", transport="attachments"):
+        """
+        Capture the current 3D viewport in memory, scaled so its largest side is at most
+        ``max_size``, and encode it once.
+
+        The viewport is drawn into an offscreen buffer at SCREENSHOT_SUPERSAMPLE times the
+        output size and box-filtered down in NumPy. The image comes back like get_mesh_data's
+        arrays: a single "image" array sent as an attachment, or in shared memory with
+        transport="shared_memory". Given a ``filepath``, it is written there instead.
+
+        ``format`` is png, jpeg or webp, and ``quality`` (1-100) applies to the lossy two.
+        ``color_mode`` is rgb, rgba or bw; JPEG has no alpha, so rgba falls back to rgb.
+        The result's "metrics" give the time spent in each step and the encoded size.
+
+        Captures are cached by a fingerprint of the scene and view state, so asking again
+        before anything changed returns the same bytes at once, with "cache_hit" set.
+        """
+        image_format, quality, color_mode = self._image_options(format, quality, color_mode)
+        if transport not in ("attachments", "shared_memory"):
+            raise ValueError(f"Unknown transport: {transport}")
+        area, region, space = self._find_viewport()
+        if not area:
+            return {"error": "No 3D viewport found"}
+
+        key = self._capture_fingerprint(region, space, max_size, image_format, quality, color_mode)
+        cached = self.capture_cache.get(key)
+        if cached is not None:
+            self.capture_cache.move_to_end(key)
+            data, result = cached
+            result = dict(result, cache_hit=True, metrics={"bytes": len(data)})
+        else:
+            data, result = self._capture_viewport(region, space, max_size, image_format, quality, color_mode)
+            self.capture_cache[key] = (data, result)
+            if len(self.capture_cache) > MAX_CACHED_CAPTURES:
+                self.capture_cache.popitem(last=False)
+            result = dict(result, cache_hit=False)
+
+        if filepath:
+            with open(filepath, "wb") as f:
+                f.write(data)
+            return dict(result, success=True, filepath=filepath)
+        image = np.frombuffer(data, dtype=np.uint8)
+        result["arrays"] = {"image": {"dtype": image.dtype.str, "shape": [image.size]}}
+        if transport == "shared_memory":
+            return self._share_buffers(result, [image])
+        result["arrays"]["image"]["attachment"] = 0
+        return BinaryResult(result, [image])
+
+    @staticmethod
+    def _image_options(format, quality, color_mode):
+        """Validate and normalize (format, quality, color mode) for a capture"""
+        image_format = "jpeg" if format.lower() == "jpg" else format.lower()
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {format}. Use png, jpeg or webp")
+        color_mode = color_mode.lower()
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Unknown color mode: {color_mode}. Use rgb, rgba or bw")
+        if image_format == "jpeg" and color_mode == "rgba":
+            color_mode = "rgb"
+        return image_format, max(1, min(100, int(quality))), color_mode
+
+    @staticmethod
+    def _capture_fingerprint(region, space, *options):
+        """
+        What a capture depends on, cheap enough to check on every request: the depsgraph
+        update count, the frame, the view and projection, the viewport's size and shading,
+        and the requested encoding
+        """
+        scene = bpy.context.scene
+        return (
+            scene_change_log.updates,
+            scene.as_pointer(),
+            scene.frame_current,
+            tuple(tuple(row) for row in space.region_3d.perspective_matrix),
+            region.width,
+            region.height,
+            space.shading.type,
+            space.overlay.show_overlays,
+            *options,
+        )
+
+    def _capture_pixels(self, region, space, max_size, color_mode):
+        """Render the viewport and scale it to fit max_size; returns (pixels, render s, scale s)"""
+        scale = min(1.0, max_size / max(region.width, region.height))
+        width = max(1, round(region.width * scale))
+        height = max(1, round(region.height * scale))
+        factor = SCREENSHOT_SUPERSAMPLE if scale < 1.0 else 1
+        started = time.perf_counter()
+        pixels = self._render_viewport(region, space, width * factor, height * factor)
+        captured = time.perf_counter()
+        pixels = _downsample(pixels if color_mode == "rgba" else pixels[:, :, :3], factor)
+        if color_mode == "bw":
+            pixels = _luma(pixels)
+        return pixels, captured - started, time.perf_counter() - captured
+
+    def _capture_viewport(self, region, space, max_size, image_format, quality, color_mode):
+        """Render, scale and encode the viewport; returns (bytes, result without the image)"""
+        pixels, capture_time, scale_time = self._capture_pixels(region, space, max_size, color_mode)
+        started = time.perf_counter()
+        data, encoder = _encode_image(pixels, image_format, quality)
+        encode_time = time.perf_counter() - started
+
+        result = {
+            "width": pixels.shape[1],
+            "height": pixels.shape[0],
+            "format": image_format,
+            "color_mode": color_mode,
+            "metrics": {
+                "capture_ms": round(capture_time * 1000, 2),
+                "scale_ms": round(scale_time * 1000, 2),
+                "encode_ms": round(encode_time * 1000, 2),
+                "encoder": encoder,
+                "bytes": len(data),
+            },
+        }
+        return data, result
+
+    @command()
+    def start_viewport_stream(self, fps=5.0, max_size=480, format="jpeg", quality=60, color_mode="rgb",
+                              min_change=0.001):
+        """
+        Push viewport frames to this client as "frame" events (the image is the event's
+        attachment) at up to ``fps``, replacing any stream it already had.
+
+        A frame is only rendered when the capture fingerprint changed, and only sent when
+        at least ``min_change`` of the sampled pixels differ from the last frame sent.
+        While the client still has output waiting to be written, frames are dropped
+        rather than queued, so a slow reader always gets the latest view. Meant for a
+        connection of its own, so frames don't hold up command responses.
+        """
+        client = self._request_context.current[0]
+        if not client.framed:
+            raise ValueError("Viewport streaming needs the framed protocol")
+        options = (max_size, *self._image_options(format, quality, color_mode))
+        if not self._find_viewport()[0]:
+            return {"error": "No 3D viewport found"}
+        fps = max(0.1, min(MAX_STREAM_FPS, float(fps)))
+        previous = self.streams.pop(client, None)
+        if previous:
+            previous.active = False
+        stream = self.streams[client] = ViewportStream(client, fps, options, min_change)
+        bpy.app.timers.register(functools.partial(self._stream_tick, stream), first_interval=0.0)
+        return {"streaming": True, "fps": fps, "format": options[1], "max_size": max_size}
+
+    @command()
+    def stop_viewport_stream(self):
+        """Stop this client's viewport stream and report how many frames it sent, skipped and dropped"""
+        stream = self.streams.pop(self._request_context.current[0], None)
+        if stream is None:
+            return {"streaming": False}
+        stream.active = False
+        return dict(stream.stats(), streaming=False)
+
+    def _stream_tick(self, stream):
+        """Timer callback for one stream; returns the delay to the next frame"""
+        if not (stream.active and self.running and not stream.client.closed):
+            if self.streams.get(stream.client) is stream:
+                del self.streams[stream.client]
+            return None
+        started = time.perf_counter()
+        try:
+            self._send_stream_frame(stream)
         except Exception as e:
-            return {"error": str(e)}
+            logger.info(f"Error streaming viewport: {str(e)}")
+        return max(0.0, stream.interval - (time.perf_counter() - started))
+
+    def _send_stream_frame(self, stream):
+        area, region, space = self._find_viewport()
+        if not area:
+            return
+        with stream.client.lock:
+            backlog = bool(stream.client.outgoing)
+        if backlog:
+            # The client hasn't taken the last frame yet; the fingerprint stays stale, so
+            # the current view goes out once it catches up
+            stream.dropped += 1
+            return
+        fingerprint = self._capture_fingerprint(region, space, *stream.options)
+        if fingerprint == stream.fingerprint:
+            return
+        stream.fingerprint = fingerprint
+
+        max_size, image_format, quality, color_mode = stream.options
+        pixels, capture_time, scale_time = self._capture_pixels(region, space, max_size, color_mode)
+        sample = pixels[::STREAM_SAMPLE_STRIDE, ::STREAM_SAMPLE_STRIDE].astype(np.int16)
+        if stream.sample is not None and stream.sample.shape == sample.shape:
+            changed = (np.abs(sample - stream.sample).max(axis=2) > STREAM_PIXEL_TOLERANCE).mean()
+            if changed < stream.min_change:
+                stream.unchanged += 1
+                return
+        stream.sample = sample
+
+        started = time.perf_counter()
+        data, _ = _encode_image(pixels, image_format, quality)
+        stream.sequence += 1
+        stream.client.send({"event": "frame", "result": dict(stream.stats(), **{
+            "sequence": stream.sequence,
+            "time": time.time(),
+            "width": pixels.shape[1],
+            "height": pixels.shape[0],
+            "format": image_format,
+            "metrics": {
+                "capture_ms": round(capture_time * 1000, 2),
+                "scale_ms": round(scale_time * 1000, 2),
+                "encode_ms": round((time.perf_counter() - started) * 1000, 2),
+                "bytes": len(data),
+            },
+        })}, [np.frombuffer(data, dtype=np.uint8)])
+        self._wakeup()
     
-    def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
-        # This is powerful but potentially dangerous - use with caution
+    def _compile(self, code, sliced=False):
+        """
+        compile() with an LRU cache keyed by the source's hash. ``sliced`` compiles the
+        code as the body of a function named SLICED_SCRIPT instead, so it may yield.
+        """
+        key = hashlib.sha1(code.encode('utf-8')).hexdigest() + (":sliced" if sliced else "")
+        code_object = self.code_cache.get(key)
+        if code_object is None:
+            filename = f"<mcp:{key[:8]}>"
+            if sliced:
+                # Graft the parsed statements into a def so line numbers stay the script's own
+                wrapper = ast.parse(f"def {SLICED_SCRIPT}():\n    pass\n")
+                wrapper.body[0].body = ast.parse(code, filename).body or wrapper.body[0].body
+                code_object = compile(wrapper, filename, "exec")
+            else:
+                code_object = compile(code, filename, "exec")
+            self.code_cache[key] = code_object
+            if len(self.code_cache) > MAX_COMPILED_CODE:
+                self.code_cache.popitem(last=False)
+        else:
+            self.code_cache.move_to_end(key)
+        return code_object
+
+    def _namespace(self, session):
+        """The persistent globals of a session's execute_code calls; a fresh one without a session"""
+        if session is None:
+            return {"bpy": bpy, "report_progress": self.report_progress}
+        namespace = self.namespaces.get(session)
+        if namespace is None:
+            namespace = self.namespaces[session] = {"bpy": bpy, "report_progress": self.report_progress}
+            if len(self.namespaces) > MAX_NAMESPACES:
+                self.namespaces.popitem(last=False)
+        else:
+            self.namespaces.move_to_end(session)
+        return namespace
+
+    @staticmethod
+    def _sliced(generator, capture_buffer):
+        """Drive a cooperative script or helper, capturing stdout only while its slices run"""
         try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
+            while True:
+                with redirect_stdout(capture_buffer):
+                    try:
+                        next(generator)
+                    except StopIteration as stop:
+                        return stop.value
+                yield
+        finally:
+            capture_buffer.flush()
 
-            # Capture stdout during execution, and return it as result
-            capture_buffer = io.StringIO()
+    def _execute_sliced(self, code_object, namespace, capture_buffer):
+        try:
             with redirect_stdout(capture_buffer):
-                exec(code, namespace)
+                exec(code_object, namespace)
+                script = namespace.pop(SLICED_SCRIPT)()
+            if isinstance(script, types.GeneratorType):
+                yield from self._sliced(script, capture_buffer)
+        except Exception as e:
+            raise Exception(f"Code execution error: {str(e)}")
+        finally:
+            capture_buffer.flush()
+        return {"executed": True, "result": capture_buffer.getvalue()}
+
+    @command()
+    def execute_code(self, code, session=None, cooperative=False):
+        """
+        Execute arbitrary Blender Python code.
+
+        Calls with the same ``session`` share their globals, so functions and variables
+        defined by one call are still there for the next.
+
+        With ``cooperative`` the code runs as the body of a generator: each bare ``yield``
+        hands the main thread back to Blender, and the script resumes on a later tick.
+        Names it assigns are then local to the run unless declared ``global``.
+        """
+        # This is powerful but potentially dangerous - use with caution
+        try:
+            namespace = self._namespace(session)
+
+            # Capture stdout during execution, streaming it as it comes, and return it as result
+            capture_buffer = StreamingOutput(self)
+            if cooperative:
+                return self._execute_sliced(self._compile(code, sliced=True), namespace, capture_buffer)
+            try:
+                with redirect_stdout(capture_buffer):
+                    exec(self._compile(code), namespace)
+            finally:
+                capture_buffer.flush()
             
             captured_output = capture_buffer.getvalue()
             return {"executed": True, "result": captured_output}
         except Exception as e:
             raise Exception(f"Code execution error: {str(e)}")
-    
-    
 
+    @command()
+    def reset_namespace(self, session):
+        """Forget everything a session's execute_code calls defined"""
+        return {"reset": self.namespaces.pop(session, None) is not None}
+
+    @command()
+    def register_helper(self, name, code):
+        """
+        Run ``code``, which must define a function called ``name``, and keep that function
+        for call_helper. Helpers are shared by all sessions and replace any earlier one
+        with the same name.
+        """
+        namespace = {"bpy": bpy, "report_progress": self.report_progress}
+        exec(self._compile(code), namespace)
+        helper = namespace.get(name)
+        if not callable(helper):
+            raise ValueError(f"The code doesn't define a function called {name}")
+        self.helpers[name] = helper
+        return {"registered": name, "helpers": sorted(self.helpers)}
+
+    @staticmethod
+    def _helper_result(result, output):
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError):
+            result = repr(result)
+        return {"result": result, "output": output}
+
+    def _call_helper_sliced(self, generator, capture_buffer):
+        result = yield from self._sliced(generator, capture_buffer)
+        return self._helper_result(result, capture_buffer.getvalue())
+
+    @command()
+    def call_helper(self, name, args=None, kwargs=None):
+        """
+        Call a registered helper; returns its result (repr'd if not JSON-serializable) and
+        output. A helper that is a generator function runs cooperatively, like
+        execute_code(cooperative=True), and its return value is the result.
+        """
+        helper = self.helpers.get(name)
+        if helper is None:
+            raise ValueError(f"Unknown helper: {name}. Registered helpers: {', '.join(sorted(self.helpers))}")
+        capture_buffer = StreamingOutput(self)
+        try:
+            with redirect_stdout(capture_buffer):
+                result = helper(*(args or []), **(kwargs or {}))
+        finally:
+            capture_buffer.flush()
+        if isinstance(result, types.GeneratorType):
+            return self._call_helper_sliced(result, capture_buffer)
+        return self._helper_result(result, capture_buffer.getvalue())
+
+    @command(integration="polyhaven", main_thread=False, cacheable=True)
     def get_polyhaven_categories(self, asset_type):
         """Get categories for a specific asset type from Polyhaven"""
         try:
             if asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}")
-            if response.status_code == 200:
-                return {"categories": response.json()}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            
+            # Counted from the local catalog rather than asked of the API each time
+            return {"categories": polyhaven_catalog.categories(asset_type)}
         except Exception as e:
             return {"error": str(e)}
     
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
+    @command(integration="polyhaven", main_thread=False, cacheable=True)
+    def search_polyhaven_assets(self, asset_type=None, categories=None, query=None, limit=20):
+        """Search for assets from Polyhaven with optional filtering and a text query"""
         try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
+            if asset_type and asset_type != "all" and asset_type not in ["hdris", "textures", "models"]:
+                return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
             
-            if asset_type and asset_type != "all":
-                if asset_type not in ["hdris", "textures", "models"]:
-                    return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-                
-            if categories:
-                params["categories"] = categories
-                
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
-                
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            # Answered from the local catalog's index; limited to keep the response size manageable
+            matches, total = polyhaven_catalog.search(asset_type, categories, query, max(1, min(int(limit), 100)))
+            return {"assets": dict(matches), "total_count": total, "returned_count": len(matches)}
         except Exception as e:
             return {"error": str(e)}
     
-    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+    @staticmethod
+    def _fetch_cached(file_info, keep=(), progress=None):
+        """(path, cache hit) for a file described by the Poly Haven files API"""
+        url = file_info["url"]
+        return asset_cache.fetch(url, url.rsplit("/", 1)[-1], file_info.get("md5"), file_info.get("size"), keep,
+                                 progress)
+
+    @staticmethod
+    def _detach_from_cache(image):
+        """
+        Make an image loaded from the asset cache independent of it, since the cache may
+        evict the file while a .blend still uses it: pack it, or if that fails, point it
+        at a copy outside the evictable part of the cache.
+        """
+        try:
+            image.pack()
+            return
+        except Exception as e:
+            logger.info(f"Could not pack {image.name}, copying it out of the cache: {str(e)}")
+        source = bpy.path.abspath(image.filepath)
+        pinned = os.path.join(asset_cache.root, "pinned", os.path.basename(os.path.dirname(source)))
+        os.makedirs(pinned, exist_ok=True)
+        copy = os.path.join(pinned, os.path.basename(source))
+        if not os.path.exists(copy):
+            shutil.copyfile(source, copy)
+        image.filepath = copy
+
+    def _fetch_all(self, files, keep=()):
+        """
+        Fetch {key: file info} concurrently on the download pool. Returns {key: (path, cache
+        hit)}, with the exception instead for files that failed.
+        """
+        executor = self.download_executor
+        report = self._download_progress(f"Downloading {len(files)} files",
+                                         {key: file_info.get("size") for key, file_info in files.items()})
+        results = {}
+        if executor is None:
+            for key, file_info in files.items():
+                try:
+                    results[key] = self._fetch_cached(file_info, keep, functools.partial(report, key))
+                except Exception as e:
+                    results[key] = e
+            return results
+        futures = {
+            key: executor.submit(self._fetch_cached, file_info, keep, functools.partial(report, key))
+            for key, file_info in files.items()
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        return results
+
+    def _fetch_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+        """
+        Worker-thread phase of download_polyhaven_asset: resolve the asset's files and
+        fetch them through the asset cache. Touches no bpy data.
+        """
         try:
             # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}")
+            files_response = http_session.get(f"https://api.polyhaven.com/files/{asset_id}")
             if files_response.status_code != 200:
                 return {"error": f"Failed to get asset files: {files_response.status_code}"}
             
@@ -487,89 +2777,16 @@ class BlenderMCPServer:
                 
                 if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
                     file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
-                    
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-                        
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
                     
+                    # Blender can't load HDR data from memory, so it's loaded from the cached file
                     try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-                        
-                        world = bpy.data.worlds[0]
-                        world.use_nodes = True
-                        node_tree = world.node_tree
-                        
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-                        
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-                        
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-                        
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-                        
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
-                                try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
-                                except:
-                                    continue
-                        
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-                        
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-                        
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
-                        
-                        # Set as active world
-                        bpy.context.scene.world = world
-                        
-                        # Clean up temporary file
-                        try:
-                            tempfile._cleanup()  # This will clean up all temporary files
-                        except:
-                            pass
-                        
-                        return {
-                            "success": True, 
-                            "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
+                        path, hit = self._fetch_cached(
+                            file_info, progress=self._download_progress(f"Downloading {asset_id} HDRI")
+                        )
+                    except requests.RequestException as e:
+                        return {"error": f"Failed to download HDRI: {str(e)}"}
+                    
+                    return {"file_format": file_format, "path": path, "cached": int(hit)}
                 else:
                     return {"error": f"Requested resolution or format not available for this HDRI"}
                     
@@ -577,52 +2794,202 @@ class BlenderMCPServer:
                 if not file_format:
                     file_format = "jpg"  # Default format for textures
                 
+                map_files = {
+                    map_type: files_data[map_type][resolution][file_format]
+                    for map_type in files_data
+                    # Skip non-texture files
+                    if map_type not in ["blend", "gltf"]
+                    and resolution in files_data[map_type] and file_format in files_data[map_type][resolution]
+                }
+                keep = {file_info.get("md5") for file_info in map_files.values()}
                 downloaded_maps = {}
+                cached = 0
+                
+                # All maps download at once; the import stays on the main thread
+                for map_type, fetched in self._fetch_all(map_files, keep).items():
+                    if isinstance(fetched, requests.HTTPError):
+                        logger.info(f"Skipping {map_type} map: {str(fetched)}")
+                        continue
+                    if isinstance(fetched, Exception):
+                        return {"error": f"Failed to process textures: {str(fetched)}"}
+                    downloaded_maps[map_type], hit = fetched
+                    cached += hit
+                
+                if not downloaded_maps:
+                    return {"error": f"No texture maps found for the requested resolution and format"}
+                
+                return {"file_format": file_format, "maps": downloaded_maps, "cached": cached}
+                
+            elif asset_type == "models":
+                # For models, prefer glTF format if available
+                if not file_format:
+                    file_format = "gltf"  # Default format for models
+                
+                if file_format in files_data and resolution in files_data[file_format]:
+                    file_info = files_data[file_format][resolution][file_format]
+                    includes = file_info.get("include") or {}
+                    keep = {file_info.get("md5")} | {info.get("md5") for info in includes.values()}
+                    
+                    # The importer resolves included files relative to the main file, so the
+                    # cached files are linked into that layout in a temporary directory
+                    temp_dir = tempfile.mkdtemp()
+                    main_file_path = ""
+                    cached = 0
+                    
+                    try:
+                        # The main file and its included files download concurrently
+                        main_file_name = file_info["url"].split("/")[-1]
+                        fetched_files = self._fetch_all(dict(includes, **{main_file_name: file_info}), keep)
+                        main_fetched = fetched_files.pop(main_file_name)
+                        if isinstance(main_fetched, requests.HTTPError):
+                            with suppress(Exception):
+                                shutil.rmtree(temp_dir)
+                            return {"error": f"Failed to download model: {str(main_fetched)}"}
+                        if isinstance(main_fetched, Exception):
+                            raise main_fetched
+                        main_file_path = os.path.join(temp_dir, main_file_name)
+                        self._link_file(main_fetched[0], main_file_path)
+                        cached += main_fetched[1]
+                        
+                        for include_path, fetched in fetched_files.items():
+                            if isinstance(fetched, requests.HTTPError):
+                                logger.info(f"Failed to download included file: {include_path}")
+                                continue
+                            if isinstance(fetched, Exception):
+                                raise fetched
+                            include_file_path = os.path.join(temp_dir, include_path)
+                            os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
+                            self._link_file(fetched[0], include_file_path)
+                            cached += fetched[1]
+                    except Exception as e:
+                        with suppress(Exception):
+                            shutil.rmtree(temp_dir)
+                        return {"error": f"Failed to import model: {str(e)}"}
+                    
+                    return {"file_format": file_format, "path": main_file_path, "temp_dir": temp_dir, "cached": cached}
+                else:
+                    return {"error": f"Requested format or resolution not available for this model"}
+                
+            else:
+                return {"error": f"Unsupported asset type: {asset_type}"}
                 
+        except Exception as e:
+            return {"error": f"Failed to download asset: {str(e)}"}
+
+    @staticmethod
+    def _link_file(source, destination):
+        """Hard-link a cached file into place, copying where links aren't possible"""
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+    @command(integration="polyhaven", prepare="_fetch_polyhaven_asset")
+    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None, prepared=None):
+        """Main-thread phase: import the files _fetch_polyhaven_asset downloaded"""
+        file_format = prepared["file_format"]
+        
+        try:
+            # Handle different asset types
+            if asset_type == "hdris":
+                file_path = prepared["path"]
                 try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:  # Skip non-texture files
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-                                
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-                                        
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-                                        
-                                        # Pack the image into .blend file
-                                        image.pack()
-                                        
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-                                        
-                                        downloaded_maps[map_type] = image
-                                        
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
+                    # Create a new world if none exists
+                    if not bpy.data.worlds:
+                        bpy.data.worlds.new("World")
+                    
+                    world = bpy.data.worlds[0]
+                    world.use_nodes = True
+                    node_tree = world.node_tree
+                    
+                    # Clear existing nodes
+                    for node in node_tree.nodes:
+                        node_tree.nodes.remove(node)
+                    
+                    # Create nodes
+                    tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+                    tex_coord.location = (-800, 0)
+                    
+                    mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+                    mapping.location = (-600, 0)
+                    
+                    # Load the image from the cached file
+                    env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+                    env_tex.location = (-400, 0)
+                    env_tex.image = bpy.data.images.load(file_path)
+                    self._detach_from_cache(env_tex.image)
+                    
+                    # Use a color space that exists in all Blender versions
+                    if file_format.lower() == 'exr':
+                        # Try to use Linear color space for EXR files
+                        try:
+                            env_tex.image.colorspace_settings.name = 'Linear'
+                        except:
+                            # Fallback to Non-Color if Linear isn't available
+                            env_tex.image.colorspace_settings.name = 'Non-Color'
+                    else:  # hdr
+                        # For HDR files, try these options in order
+                        for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
+                            try:
+                                env_tex.image.colorspace_settings.name = color_space
+                                break  # Stop if we successfully set a color space
+                            except:
+                                continue
+                    
+                    background = node_tree.nodes.new(type='ShaderNodeBackground')
+                    background.location = (-200, 0)
+                    
+                    output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+                    output.location = (0, 0)
+                    
+                    # Connect nodes
+                    node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+                    node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+                    node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+                    node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+                    
+                    # Set as active world
+                    bpy.context.scene.world = world
+                    
+                    return {
+                        "success": True, 
+                        "message": f"HDRI {asset_id} imported successfully",
+                        "image_name": env_tex.image.name,
+                        "cached_files": prepared.get("cached", 0)
+                    }
+                except Exception as e:
+                    return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
+                    
+            elif asset_type == "textures":
+                downloaded_maps = {}
                 
-                    if not downloaded_maps:
-                        return {"error": f"No texture maps found for the requested resolution and format"}
+                try:
+                    for map_type, file_path in prepared["maps"].items():
+                        # Load image from the cached file
+                        image = bpy.data.images.load(file_path)
+                        image.name = f"{asset_id}_{map_type}.{file_format}"
+                        
+                        # Pack the image into .blend file
+                        self._detach_from_cache(image)
+                        
+                        # Set color space based on map type
+                        if map_type in ['color', 'diffuse', 'albedo']:
+                            try:
+                                image.colorspace_settings.name = 'sRGB'
+                            except:
+                                pass
+                        else:
+                            try:
+                                image.colorspace_settings.name = 'Non-Color'
+                            except:
+                                pass
+                        
+                        downloaded_maps[map_type] = image
+                    
+                    # set_texture finds these by the map type it parses from the image names
+                    texture_registry.set(asset_id, {
+                        _texture_map_key(image.name): image for image in downloaded_maps.values()
+                    })
                     
                     # Create a new material with the downloaded textures
                     mat = bpy.data.materials.new(name=asset_id)
@@ -702,90 +3069,51 @@ class BlenderMCPServer:
                         "success": True, 
                         "message": f"Texture {asset_id} imported as material",
                         "material": mat.name,
-                        "maps": list(downloaded_maps.keys())
+                        "maps": list(downloaded_maps.keys()),
+                        "cached_files": prepared.get("cached", 0)
                     }
                 
                 except Exception as e:
                     return {"error": f"Failed to process textures: {str(e)}"}
                 
             elif asset_type == "models":
-                # For models, prefer glTF format if available
-                if not file_format:
-                    file_format = "gltf"  # Default format for models
+                main_file_path = prepared["path"]
                 
-                if file_format in files_data and resolution in files_data[file_format]:
-                    file_info = files_data[file_format][resolution][file_format]
-                    file_url = file_info["url"]
+                try:
+                    # Import the model into Blender
+                    if file_format == "gltf" or file_format == "glb":
+                        bpy.ops.import_scene.gltf(filepath=main_file_path)
+                    elif file_format == "fbx":
+                        bpy.ops.import_scene.fbx(filepath=main_file_path)
+                    elif file_format == "obj":
+                        bpy.ops.import_scene.obj(filepath=main_file_path)
+                    elif file_format == "blend":
+                        # For blend files, we need to append or link
+                        with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
+                            data_to.objects = data_from.objects
+                        
+                        # Link the objects to the scene
+                        for obj in data_to.objects:
+                            if obj is not None:
+                                bpy.context.collection.objects.link(obj)
+                    else:
+                        return {"error": f"Unsupported model format: {file_format}"}
                     
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
+                    # Get the names of imported objects
+                    imported_objects = [obj.name for obj in bpy.context.selected_objects]
                     
-                    try:
-                        # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-                        
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
-                        
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
-                        
-                        # Check for included files and download them
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                # Get the URL for the included file - this is the fix
-                                include_url = include_info["url"]
-                                
-                                # Create the directory structure for the included file
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-                                
-                                # Download the included file
-                                include_response = requests.get(include_url)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    logger.info(f"Failed to download included file: {include_path}")
-                        
-                        # Import the model into Blender
-                        if file_format == "gltf" or file_format == "glb":
-                            bpy.ops.import_scene.gltf(filepath=main_file_path)
-                        elif file_format == "fbx":
-                            bpy.ops.import_scene.fbx(filepath=main_file_path)
-                        elif file_format == "obj":
-                            bpy.ops.import_scene.obj(filepath=main_file_path)
-                        elif file_format == "blend":
-                            # For blend files, we need to append or link
-                            with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
-                                data_to.objects = data_from.objects
-                            
-                            # Link the objects to the scene
-                            for obj in data_to.objects:
-                                if obj is not None:
-                                    bpy.context.collection.objects.link(obj)
-                        else:
-                            return {"error": f"Unsupported model format: {file_format}"}
-                        
-                        # Get the names of imported objects
-                        imported_objects = [obj.name for obj in bpy.context.selected_objects]
-                        
-                        return {
-                            "success": True, 
-                            "message": f"Model {asset_id} imported successfully",
-                            "imported_objects": imported_objects
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                else:
-                    return {"error": f"Requested format or resolution not available for this model"}
+                    return {
+                        "success": True, 
+                        "message": f"Model {asset_id} imported successfully",
+                        "imported_objects": imported_objects,
+                        "cached_files": prepared.get("cached", 0)
+                    }
+                except Exception as e:
+                    return {"error": f"Failed to import model: {str(e)}"}
+                finally:
+                    # Clean up temporary directory
+                    with suppress(Exception):
+                        shutil.rmtree(prepared["temp_dir"])
                 
             else:
                 return {"error": f"Unsupported asset type: {asset_type}"}
@@ -793,6 +3121,7 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": f"Failed to download asset: {str(e)}"}
 
+    @command(integration="polyhaven")
     def set_texture(self, object_name, texture_id):
         """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
         try:
@@ -805,43 +3134,24 @@ class BlenderMCPServer:
             if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
                 return {"error": f"Object {object_name} cannot accept materials"}
             
-            # Find all images related to this texture and ensure they're properly loaded
-            texture_images = {}
-            for img in bpy.data.images:
-                if img.name.startswith(texture_id + "_"):
-                    # Extract the map type from the image name
-                    map_type = img.name.split('_')[-1].split('.')[0]
-                    
-                    # Force a reload of the image
-                    img.reload()
-                    
-                    # Ensure proper color space
-                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                        try:
-                            img.colorspace_settings.name = 'sRGB'
-                        except:
-                            pass
-                    else:
-                        try:
-                            img.colorspace_settings.name = 'Non-Color'
-                        except:
-                            pass
-                    
-                    # Ensure the image is packed
-                    if not img.packed_file:
-                        img.pack()
-                    
-                    texture_images[map_type] = img
-                    logger.info(f"Loaded texture map: {map_type} - {img.name}")
-                    
-                    # Debug info
-                    logger.info(f"Image size: {img.size[0]}x{img.size[1]}")
-                    logger.info(f"Color space: {img.colorspace_settings.name}")
-                    logger.info(f"File format: {img.file_format}")
-                    logger.info(f"Is packed: {bool(img.packed_file)}")
+            # The images download_polyhaven_asset registered, used as they are: reloading or
+            # repacking them on every call would re-read their pixels each time
+            texture_images = texture_registry.images(texture_id)
+            if texture_images is None:
+                # Downloaded before this session (e.g. saved in the .blend): find them once
+                texture_images = {}
+                for img in bpy.data.images:
+                    if img.name.startswith(texture_id + "_"):
+                        # Ensure the image is packed
+                        if not img.packed_file:
+                            img.pack()
+                        texture_images[_texture_map_key(img.name)] = img
+                if texture_images:
+                    texture_registry.set(texture_id, texture_images)
 
             if not texture_images:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
+            logger.info(f"Applying texture maps: {', '.join(texture_images)}")
             
             # Create a new material
             new_mat_name = f"{texture_id}_material_{object_name}"
@@ -890,16 +3200,7 @@ class BlenderMCPServer:
                 tex_node.image = image
                 
                 # Set color space based on map type
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'sRGB'
-                    except:
-                        pass  # Use default if sRGB not available
-                else:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'Non-Color'
-                    except:
-                        pass  # Use default if Non-Color not available
+                _set_map_colorspace(image, map_type)
                 
                 links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
                 
@@ -1097,6 +3398,21 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": f"Failed to apply texture: {str(e)}"}
 
+    @command()
+    def get_status(self):
+        """Cheap snapshot of which integrations are enabled; clients cache it instead of pinging"""
+        scene = bpy.context.scene
+        return {
+            "version": list(bl_info["version"]),
+            "protocol_version": PROTOCOL_VERSION,
+            "polyhaven_enabled": scene.blendermcp_use_polyhaven,
+            "hyper3d_enabled": scene.blendermcp_use_hyper3d and bool(scene.blendermcp_hyper3d_api_key),
+            "hyper3d_mode": scene.blendermcp_hyper3d_mode,
+            "sketchfab_enabled": scene.blendermcp_use_sketchfab and bool(scene.blendermcp_sketchfab_api_key),
+            "commands": sorted(self._get_command_table()),
+        }
+
+    @command()
     def get_polyhaven_status(self):
         """Get the current status of PolyHaven integration"""
         enabled = bpy.context.scene.blendermcp_use_polyhaven
@@ -1112,6 +3428,7 @@ class BlenderMCPServer:
         }
 
     #region Hyper3D
+    @command()
     def get_hyper3d_status(self):
         """Get the current status of Hyper3D Rodin integration"""
         enabled = bpy.context.scene.blendermcp_use_hyper3d
@@ -1141,8 +3458,9 @@ class BlenderMCPServer:
                             3. Restart the connection to Claude"""
             }
 
+    @command(integration="hyper3d", main_thread=False)
     def create_rodin_job(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
+        match self.settings["hyper3d_mode"]:
             case "MAIN_SITE":
                 return self.create_rodin_job_main_site(*args, **kwargs)
             case "FAL_AI":
@@ -1172,7 +3490,7 @@ class BlenderMCPServer:
             response = requests.post(
                 "https://hyperhuman.deemos.com/api/v2/rodin",
                 headers={
-                    "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                    "Authorization": f"Bearer {self.settings['hyper3d_api_key']}",
                 },
                 files=files
             )
@@ -1200,7 +3518,7 @@ class BlenderMCPServer:
             response = requests.post(
                 "https://queue.fal.run/fal-ai/hyper3d/rodin",
                 headers={
-                    "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                    "Authorization": f"Key {self.settings['hyper3d_api_key']}",
                     "Content-Type": "application/json",
                 },
                 json=req_data
@@ -1210,8 +3528,9 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
 
+    @command(integration="hyper3d", main_thread=False)
     def poll_rodin_job_status(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
+        match self.settings["hyper3d_mode"]:
             case "MAIN_SITE":
                 return self.poll_rodin_job_status_main_site(*args, **kwargs)
             case "FAL_AI":
@@ -1224,7 +3543,7 @@ class BlenderMCPServer:
         response = requests.post(
             "https://hyperhuman.deemos.com/api/v2/status",
             headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Bearer {self.settings['hyper3d_api_key']}",
             },
             json={
                 "subscription_key": subscription_key,
@@ -1240,7 +3559,7 @@ class BlenderMCPServer:
         response = requests.get(
             f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
             headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"KEY {self.settings['hyper3d_api_key']}",
             },
         )
         data = response.json()
@@ -1313,101 +3632,27 @@ class BlenderMCPServer:
 
         return mesh_obj
 
-    def import_generated_asset(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
+    def _fetch_generated_asset(self, *args, **kwargs):
+        """Worker-thread phase of import_generated_asset: download the GLB to a temp file"""
+        match self.settings["hyper3d_mode"]:
             case "MAIN_SITE":
-                return self.import_generated_asset_main_site(*args, **kwargs)
+                return self._fetch_generated_asset_main_site(*args, **kwargs)
             case "FAL_AI":
-                return self.import_generated_asset_fal_ai(*args, **kwargs)
+                return self._fetch_generated_asset_fal_ai(*args, **kwargs)
             case _:
-                return f"Error: Unknown Hyper3D Rodin mode!"
-
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                'task_uuid': task_uuid
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        for i in data_["list"]:
-            if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-    
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-                    
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-                        
-                    # Close the file
-                    temp_file.close()
-                    
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-                
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
+                return {"succeed": False, "error": "Unknown Hyper3D Rodin mode!"}
 
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-            
-            return {
-                "succeed": True, **result
-            }
-        except Exception as e:
-            return {"succeed": False, "error": str(e)}
-    
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
-            headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        
+    @staticmethod
+    def _download_glb(url, prefix):
         temp_file = tempfile.NamedTemporaryFile(
             delete=False,
-            prefix=request_id,
+            prefix=prefix,
             suffix=".glb",
         )
 
         try:
             # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
+            response = requests.get(url, stream=True)
             response.raise_for_status()  # Raise an exception for HTTP errors
             
             # Write the content to the temporary file
@@ -1423,9 +3668,43 @@ class BlenderMCPServer:
             os.unlink(temp_file.name)
             return {"succeed": False, "error": str(e)}
 
+        return {"path": temp_file.name, "temporary": True}
+
+    def _fetch_generated_asset_main_site(self, task_uuid: str, name: str):
+        response = requests.post(
+            "https://hyperhuman.deemos.com/api/v2/download",
+            headers={
+                "Authorization": f"Bearer {self.settings['hyper3d_api_key']}",
+            },
+            json={
+                'task_uuid': task_uuid
+            }
+        )
+        data_ = response.json()
+        for i in data_["list"]:
+            if i["name"].endswith(".glb"):
+                return self._download_glb(i["url"], task_uuid)
+        return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
+
+    def _fetch_generated_asset_fal_ai(self, request_id: str, name: str):
+        response = requests.get(
+            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
+            headers={
+                "Authorization": f"Key {self.settings['hyper3d_api_key']}",
+            }
+        )
+        data_ = response.json()
+        return self._download_glb(data_["model_mesh"]["url"], request_id)
+
+    @command(integration="hyper3d", prepare="_fetch_generated_asset")
+    def import_generated_asset(self, *args, prepared=None, **kwargs):
+        """Import the GLB downloaded by _fetch_generated_asset into blender"""
+        # Both modes name the mesh after the `name` parameter
+        name = kwargs["name"] if "name" in kwargs else args[1]
+
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=prepared["path"],
                 mesh_name=name
             )
             result = {
@@ -1448,10 +3727,11 @@ class BlenderMCPServer:
     #endregion
 
     #region Sketchfab API
+    @command(main_thread=False)
     def get_sketchfab_status(self):
         """Get the current status of Sketchfab integration"""
-        enabled = bpy.context.scene.blendermcp_use_sketchfab
-        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        enabled = self.settings["use_sketchfab"]
+        api_key = self.settings["sketchfab_api_key"]
         
         # Test the API key if present
         if api_key:
@@ -1510,10 +3790,11 @@ class BlenderMCPServer:
                             4. Restart the connection to Claude"""
             }
     
+    @command(integration="sketchfab", main_thread=False, cacheable=True)
     def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True):
         """Search for models on Sketchfab based on query and optional filters"""
         try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+            api_key = self.settings["sketchfab_api_key"]
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
                 
@@ -1572,10 +3853,10 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": str(e)}
 
-    def download_sketchfab_model(self, uid):
-        """Download a model from Sketchfab by its UID"""
+    def _fetch_sketchfab_model(self, uid):
+        """Worker-thread phase of download_sketchfab_model: download and unpack the archive"""
         try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+            api_key = self.settings["sketchfab_api_key"]
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
                 
@@ -1614,18 +3895,19 @@ class BlenderMCPServer:
             if not download_url:
                 return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
                 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
-            
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
-                
-            # Save to temporary file
+            # Stream the archive to a temporary file (60 second timeout between reads)
             temp_dir = tempfile.mkdtemp()
             zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
-            
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
+            try:
+                download_file(download_url, zip_file_path, progress=self._download_progress("Downloading model"))
+            except requests.HTTPError as e:
+                with suppress(Exception):
+                    shutil.rmtree(temp_dir)
+                return {"error": f"Model download failed: {str(e)}"}
+            except Exception:
+                with suppress(Exception):
+                    shutil.rmtree(temp_dir)
+                raise
                 
             # Extract the zip file with enhanced security
             with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
@@ -1667,30 +3949,41 @@ class BlenderMCPServer:
                 
             main_file = os.path.join(temp_dir, gltf_files[0])
             
+            return {"temp_dir": temp_dir, "path": main_file}
+        
+        except requests.exceptions.Timeout:
+            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
+        except json.JSONDecodeError as e:
+            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return {"error": f"Failed to download model: {str(e)}"}
+
+    @command(integration="sketchfab", prepare="_fetch_sketchfab_model")
+    def download_sketchfab_model(self, uid, prepared=None):
+        """Download a model from Sketchfab by its UID"""
+        try:
             # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+            bpy.ops.import_scene.gltf(filepath=prepared["path"])
             
             # Get the names of imported objects
             imported_objects = [obj.name for obj in bpy.context.selected_objects]
             
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
-            
             return {
                 "success": True,
                 "message": "Model imported successfully",
                 "imported_objects": imported_objects
             }
-        
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
         except Exception as e:
             import traceback
             traceback.print_exc()
             return {"error": f"Failed to download model: {str(e)}"}
+        finally:
+            # Clean up temporary files
+            with suppress(Exception):
+                shutil.rmtree(prepared["temp_dir"])
+
     #endregion
 
 # Blender UI Panel
@@ -1706,6 +3999,7 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
         scene = context.scene
         
         layout.prop(scene, "blendermcp_port")
+        layout.prop(scene, "blendermcp_tick_budget")
         layout.prop(scene, "blendermcp_use_polyhaven", text="Use assets from Poly Haven")
 
         layout.prop(scene, "blendermcp_use_hyper3d", text="Use Hyper3D Rodin 3D model generation")
@@ -1723,6 +4017,11 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
         else:
             layout.operator("blendermcp.stop_server", text="Disconnect from MCP server")
             layout.label(text=f"Running on port {scene.blendermcp_port}")
+            server = getattr(bpy.types, "blendermcp_server", None)
+            if server:
+                layout.label(text=f"Clients: {len(server.clients)}, queued commands: {server.queue_depth}")
+                if server.tasks:
+                    layout.label(text=f"Cooperative commands running: {len(server.tasks)}")
 
 # Operator to set Hyper3D API Key
 class BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey(bpy.types.Operator):
@@ -1772,6 +4071,15 @@ class BLENDERMCP_OT_StopServer(bpy.types.Operator):
         
         return {'FINISHED'}
 
+def _on_integration_setting_changed(self, context):
+    """Push the new status snapshot so connected MCP servers don't have to poll for it"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server:
+        server.invalidate_command_table()
+        server._get_command_table()  # Refresh the settings snapshot used by worker threads
+        if server.running:
+            server.broadcast_event("status", server.get_status())
+
 # Registration functions
 def register():
     bpy.types.Scene.blendermcp_port = IntProperty(
@@ -1790,13 +4098,15 @@ def register():
     bpy.types.Scene.blendermcp_use_polyhaven = bpy.props.BoolProperty(
         name="Use Poly Haven",
         description="Enable Poly Haven asset integration",
-        default=False
+        default=False,
+        update=_on_integration_setting_changed
     )
 
     bpy.types.Scene.blendermcp_use_hyper3d = bpy.props.BoolProperty(
         name="Use Hyper3D Rodin",
         description="Enable Hyper3D Rodin generatino integration",
-        default=False
+        default=False,
+        update=_on_integration_setting_changed
     )
 
     bpy.types.Scene.blendermcp_hyper3d_mode = bpy.props.EnumProperty(
@@ -1806,29 +4116,45 @@ def register():
             ("MAIN_SITE", "hyper3d.ai", "hyper3d.ai"),
             ("FAL_AI", "fal.ai", "fal.ai"),
         ],
-        default="MAIN_SITE"
+        default="MAIN_SITE",
+        update=_on_integration_setting_changed
     )
 
     bpy.types.Scene.blendermcp_hyper3d_api_key = bpy.props.StringProperty(
         name="Hyper3D API Key",
         subtype="PASSWORD",
         description="API Key provided by Hyper3D",
-        default=""
+        default="",
+        update=_on_integration_setting_changed
     )
     
     bpy.types.Scene.blendermcp_use_sketchfab = bpy.props.BoolProperty(
         name="Use Sketchfab",
         description="Enable Sketchfab asset integration",
-        default=False
+        default=False,
+        update=_on_integration_setting_changed
     )
 
     bpy.types.Scene.blendermcp_sketchfab_api_key = bpy.props.StringProperty(
         name="Sketchfab API Key",
         subtype="PASSWORD",
         description="API Key provided by Sketchfab",
-        default=""
+        default="",
+        update=_on_integration_setting_changed
     )
     
+    bpy.types.Scene.blendermcp_tick_budget = bpy.props.FloatProperty(
+        name="Tick Budget (ms)",
+        description="Main-thread time MCP commands may use per timer tick before Blender gets it back",
+        default=DEFAULT_TICK_BUDGET,
+        min=1.0,
+        max=1000.0
+    )
+    
+    BlenderMCPServer.build_command_registry()
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.load_post.append(_on_load_post)
+    
     bpy.utils.register_class(BLENDERMCP_PT_Panel)
     bpy.utils.register_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
     bpy.utils.register_class(BLENDERMCP_OT_StartServer)
@@ -1842,6 +4168,12 @@ def unregister():
         bpy.types.blendermcp_server.stop()
         del bpy.types.blendermcp_server
     
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
+    scene_change_log.reset()
+    
     bpy.utils.unregister_class(BLENDERMCP_PT_Panel)
     bpy.utils.unregister_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
     bpy.utils.unregister_class(BLENDERMCP_OT_StartServer)
@@ -1855,6 +4187,7 @@ def unregister():
     del bpy.types.Scene.blendermcp_hyper3d_api_key
     del bpy.types.Scene.blendermcp_use_sketchfab
     del bpy.types.Scene.blendermcp_sketchfab_api_key
+    del bpy.types.Scene.blendermcp_tick_budget
 
     logger.info("BlenderMCP addon unregistered")
 
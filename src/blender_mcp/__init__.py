@@ -3,4 +3,11 @@
 __version__ = "0.1.0"
 
 # Expose key classes and functions for easier imports
-from .server import BlenderConnection, get_blender_connection
+from .server import (
+    AsyncBlenderConnection,
+    BlenderConnection,
+    BlenderConnectionPool,
+    get_async_blender_connection,
+    get_blender_connection,
+    get_blender_pool,
+)
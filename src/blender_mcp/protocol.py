@@ -0,0 +1,155 @@
+# protocol.py
+"""
+Wire framing for the MCP server <-> Blender addon socket.
+
+A framed message is a fixed-size header followed by a UTF-8 JSON payload:
+
+    magic (4 bytes, b"BMCP") | version (u8) | flags (u8) | length (u32, big-endian)
+
+The receiver reads exactly ``FRAME_HEADER.size`` bytes, then exactly ``length``
+bytes into a preallocated buffer, and parses the payload once.
+
+Framing is negotiated: the client first sends a legacy (bare JSON) command of
+type ``NEGOTIATE_COMMAND``. An addon that knows the framed protocol answers with
+the version to use; an older addon answers with an "Unknown command type" error
+and the connection stays on the legacy JSON stream.
+
+From version 2 a frame may also carry binary attachments (``FLAG_ATTACHMENTS``),
+so bulk arrays such as mesh data travel as raw bytes instead of JSON text:
+
+    json length (u32, big-endian) | JSON | attachment 0 | attachment 1 | ...
+
+The JSON's top-level ``"attachments"`` entry lists each attachment's byte length,
+and the decoder replaces it with the attachments themselves. A peer on an older
+version gets the same entry as a list of base64 strings instead.
+
+The Blender addon (addon.py) is installed as a single file, so it carries its
+own copy of these constants - keep both in sync.
+"""
+import base64
+import json
+import socket
+import struct
+from typing import Any, Dict, Sequence, Tuple
+
+FRAME_MAGIC = b"BMCP"
+PROTOCOL_VERSION = 2
+ATTACHMENTS_VERSION = 2  # first version whose frames may carry binary attachments
+FRAME_HEADER = struct.Struct("!4sBBI")
+JSON_LENGTH = struct.Struct("!I")  # prefixes the JSON part of a frame with attachments
+FLAG_ATTACHMENTS = 0x01
+MAX_FRAME_SIZE = 1 << 31  # 2 GiB, well above anything a scene dump produces
+
+NEGOTIATE_COMMAND = "negotiate_protocol"
+LEGACY_PROTOCOL_VERSION = 0
+
+# Keepalive probing so a vanished Blender is noticed without an application-level ping
+KEEPALIVE_IDLE = 30  # seconds of silence before the first probe
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT = 3
+
+
+class ProtocolError(Exception):
+    """Raised when the peer sends bytes that are not a valid frame"""
+
+
+def configure_socket(sock: socket.socket) -> None:
+    """Disable Nagle (requests are small and latency-bound) and enable TCP keepalive"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # The tuning knobs are platform specific; keep the OS defaults where they're missing
+    for option, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE),
+                          ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+                          ("TCP_KEEPCNT", KEEPALIVE_COUNT)):
+        if hasattr(socket, option):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+            except OSError:
+                pass
+
+
+def encode_frame(message: Dict[str, Any], flags: int = 0, version: int = PROTOCOL_VERSION,
+                 attachments: Sequence[Any] = ()) -> bytes:
+    """
+    Serialize a message into a single framed buffer for a peer speaking ``version``.
+
+    ``attachments`` are bytes-like objects (bytes, memoryview, contiguous arrays).
+    """
+    if attachments and version < ATTACHMENTS_VERSION:
+        message, attachments = inline_attachments(message, attachments), ()
+    if not attachments:
+        payload = json.dumps(message).encode('utf-8')
+        return FRAME_HEADER.pack(FRAME_MAGIC, version, flags, len(payload)) + payload
+    views = [memoryview(data).cast('B') for data in attachments]
+    text = json.dumps(dict(message, attachments=[view.nbytes for view in views])).encode('utf-8')
+    length = JSON_LENGTH.size + len(text) + sum(view.nbytes for view in views)
+    header = FRAME_HEADER.pack(FRAME_MAGIC, version, flags | FLAG_ATTACHMENTS, length)
+    return b''.join([header, JSON_LENGTH.pack(len(text)), text, *views])
+
+
+def decode_header(header: bytes) -> Tuple[int, int, int]:
+    """Validate a frame header and return (version, flags, payload length)"""
+    magic, version, flags, length = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ProtocolError(f"Bad frame magic: {magic!r}")
+    if version > PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported frame version: {version}")
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    return version, flags, length
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """Read exactly ``size`` bytes from ``sock`` into a preallocated buffer"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            raise ConnectionError("Connection closed in the middle of a frame")
+        received += count
+    return buffer
+
+
+def inline_attachments(message: Dict[str, Any], attachments: Sequence[Any]) -> Dict[str, Any]:
+    """Carry attachments as base64 text, for peers that can't take binary frames"""
+    return dict(message, attachments=[base64.b64encode(data).decode('ascii') for data in attachments])
+
+
+def decode_payload(payload: bytearray, flags: int) -> Dict[str, Any]:
+    """Parse a frame's payload, slicing out its attachments without copying them"""
+    if not flags & FLAG_ATTACHMENTS:
+        return json.loads(payload)
+    view = memoryview(payload)
+    (text_length,) = JSON_LENGTH.unpack_from(view)
+    offset = JSON_LENGTH.size + text_length
+    message = json.loads(view[JSON_LENGTH.size:offset].tobytes())
+    attachments = []
+    for length in message.get("attachments", []):
+        attachments.append(view[offset:offset + length])
+        offset += length
+    if offset != len(payload):
+        raise ProtocolError("Attachment lengths don't match the frame size")
+    message["attachments"] = attachments
+    return message
+
+
+def recv_frame(sock: socket.socket) -> Dict[str, Any]:
+    """Read one framed message from ``sock`` and parse its payload"""
+    _, flags, length = decode_header(recv_exact(sock, FRAME_HEADER.size))
+    return decode_payload(recv_exact(sock, length), flags)
+
+
+def response_result(response: Dict[str, Any]) -> Any:
+    """
+    The result of a successful response. Attachments, whether they came as binary or
+    as base64 from an addon on an older version, end up in ``result["attachments"]``.
+    """
+    result = response.get("result", {})
+    attachments = response.get("attachments")
+    if attachments is not None and isinstance(result, dict):
+        result["attachments"] = [
+            base64.b64decode(data) if isinstance(data, str) else data for data in attachments
+        ]
+    return result
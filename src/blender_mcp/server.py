@@ -2,18 +2,40 @@
 from mcp.server.fastmcp import FastMCP, Context, Image
 import socket
 import json
+import array
 import asyncio
 import logging
 import tempfile
-from dataclasses import dataclass
-from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+import itertools
+import math
+import time
+import uuid
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from collections import Counter
+from dataclasses import dataclass, field
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Sequence, Tuple
 import os
 from pathlib import Path
 import base64
 import sys
 from urllib.parse import urlparse
 
+from .protocol import (
+    FRAME_HEADER,
+    LEGACY_PROTOCOL_VERSION,
+    NEGOTIATE_COMMAND,
+    PROTOCOL_VERSION,
+    configure_socket,
+    decode_header,
+    decode_payload,
+    encode_frame,
+    inline_attachments,
+    recv_frame,
+    response_result,
+)
+
 # Configure logging
 # 配置日志强制输出到 stdout
 logging.basicConfig(
@@ -25,6 +47,76 @@ logging.basicConfig(
 
 logger = logging.getLogger("BlenderMCPServer")
 
+# Blender addon endpoints served by this MCP server, as comma-separated "host:port" entries.
+# A "host:first-last" entry expands to every port in the range, which lets the pool discover
+# headless Blenders as they come up. The default is the single addon on localhost:9876.
+BLENDER_ENDPOINTS = os.environ.get("BLENDER_MCP_ENDPOINTS", "localhost:9876")
+HEALTH_CHECK_INTERVAL = 10.0  # seconds between pool health checks
+RECONNECT_BACKOFF = 5.0  # seconds before an unreachable endpoint is tried again
+# A session whose Blender instance is down fails its commands rather than moving to another
+# instance (and scene) unless this is set
+ALLOW_SESSION_MIGRATION = os.environ.get("BLENDER_MCP_ALLOW_SESSION_MIGRATION", "").lower() in ("1", "true", "yes")
+
+# Blender on one of these hosts shares bulk arrays through shared memory instead of the socket
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# Viewport stream frames buffered for a slow consumer; older ones are dropped first
+STREAM_QUEUE_FRAMES = 4
+
+# Commands that keep reporting progress (or heartbeats from the addon) only time out after
+# going quiet for the connection's timeout, but never run longer than this
+COMMAND_TIME_LIMIT = float(os.environ.get("BLENDER_MCP_COMMAND_TIME_LIMIT", "3600"))
+
+# How long a cached addon status snapshot is trusted before it is fetched again.
+# Addons on the framed protocol also push a fresh snapshot whenever a setting changes.
+STATUS_TTL = 30.0
+
+
+def _legacy_status(polyhaven_status: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a status snapshot for addons that predate the get_status command"""
+    return {"polyhaven_enabled": polyhaven_status.get("enabled", False)}
+
+
+def _array_nbytes(meta: Dict[str, Any]) -> int:
+    """Size of an array described by its numpy dtype string (e.g. "<f4") and shape"""
+    return int(meta["dtype"][2:]) * math.prod(meta["shape"])
+
+
+def _read_shared_memory(name: str, extents: Dict[str, Tuple[int, int]]) -> Dict[str, bytes]:
+    """Copy (offset, size) extents out of a shared memory block the addon owns"""
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == "posix" and sys.version_info < (3, 13):
+        # Attaching registers the block for cleanup at exit, but the addon unlinks it
+        resource_tracker.unregister(block._name, "shared_memory")
+    try:
+        return {key: bytes(block.buf[offset:offset + size]) for key, (offset, size) in extents.items()}
+    finally:
+        block.close()
+
+
+def _attach(attachments: List[Any], values: List[Any], typecode: str) -> Dict[str, Any]:
+    """
+    Append a flat or nested list of numbers to ``attachments`` as a little-endian buffer
+    ("f" float32, "i" int32) and return the param that refers to it
+    """
+    if values and isinstance(values[0], (list, tuple)):
+        values = itertools.chain.from_iterable(values)
+    data = array.array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    attachments.append(data)
+    return {"attachment": len(attachments) - 1, "dtype": {"f": "<f4", "i": "<i4"}[typecode]}
+
+
+def _write_npy(path: str, data: Any, dtype: str, shape: List[int]):
+    """Write a raw little-endian buffer as a .npy file (format 1.0), without needing NumPy"""
+    header = repr({"descr": dtype, "fortran_order": False, "shape": tuple(shape)})
+    # The header is padded so the data starts on a 64-byte boundary
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    with open(path, "wb") as f:
+        f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+        f.write(data)
+
 # 确保所有日志都输出到 stdout
 for handler in logging.root.handlers:
     handler.setStream(sys.stdout)
@@ -35,6 +127,11 @@ class BlenderConnection:
     host: str
     port: int
     sock: socket.socket = None  # Changed from 'socket' to 'sock' to avoid naming conflict
+    protocol_version: int = LEGACY_PROTOCOL_VERSION  # 0 means the legacy bare-JSON stream
+    _request_ids: Any = field(default_factory=lambda: itertools.count(1), repr=False)
+    _responses: Dict[int, Dict[str, Any]] = field(default_factory=dict, repr=False)  # arrived ahead of their waiter
+    status: Dict[str, Any] = None  # Last status snapshot reported by the addon
+    status_time: float = 0.0
     
     def connect(self) -> bool:
         """Connect to the Blender addon socket server"""
@@ -43,13 +140,28 @@ class BlenderConnection:
             
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            configure_socket(self.sock)
             self.sock.connect((self.host, self.port))
             logger.info(f"Connected to Blender at {self.host}:{self.port}")
+            self.protocol_version = self._negotiate_protocol()
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Blender: {str(e)}")
             self.sock = None
             return False
+
+    def _negotiate_protocol(self) -> int:
+        """Ask the addon for framed messages, falling back to legacy JSON if it doesn't know them"""
+        hello = {"type": NEGOTIATE_COMMAND, "params": {"versions": list(range(1, PROTOCOL_VERSION + 1))}}
+        self.sock.sendall(json.dumps(hello).encode('utf-8'))
+        response = json.loads(self.receive_full_response(self.sock).decode('utf-8'))
+        version = response.get("result", {}).get("version", LEGACY_PROTOCOL_VERSION) \
+            if response.get("status") == "success" else LEGACY_PROTOCOL_VERSION
+        if version:
+            logger.info(f"Using framed protocol v{version}")
+        else:
+            logger.info("Addon does not support framing, using legacy JSON protocol")
+        return version
     
     def disconnect(self):
         """Disconnect from the Blender addon"""
@@ -60,6 +172,8 @@ class BlenderConnection:
                 logger.error(f"Error disconnecting from Blender: {str(e)}")
             finally:
                 self.sock = None
+                self.protocol_version = LEGACY_PROTOCOL_VERSION
+                self.status = None
 
     def receive_full_response(self, sock, buffer_size=8192):
         """Receive the complete response, potentially in multiple chunks"""
@@ -117,39 +231,94 @@ class BlenderConnection:
         else:
             raise Exception("No data received")
 
-    def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to Blender and return the response"""
-        if not self.sock and not self.connect():
-            raise ConnectionError("Not connected to Blender")
+    def submit_command(self, command_type: str, params: Dict[str, Any] = None, attachments: Sequence[Any] = ()) -> int:
+        """
+        Send a command without waiting for its response and return its request ID.
         
+        ``attachments`` are bytes-like buffers that params refer to by index, e.g.
+        {"positions": {"attachment": 0, "dtype": "<f4", "shape": [n, 3]}}.
+        """
+        request_id = next(self._request_ids)
         command = {
+            "id": request_id,
             "type": command_type,
             "params": params or {}
         }
         
-        try:
-            # Log the command being sent
-            logger.info(f"Sending command: {command_type} with params: {params}")
-            
-            # Send the command
+        # Log the command being sent
+        logger.info(f"Sending command #{request_id}: {command_type} with params: {params}")
+        
+        if self.protocol_version:
+            self.sock.sendall(encode_frame(command, version=self.protocol_version, attachments=attachments))
+        else:
+            if attachments:
+                command = inline_attachments(command, attachments)
             self.sock.sendall(json.dumps(command).encode('utf-8'))
-            logger.info(f"Command sent, waiting for response...")
-            
-            # Set a timeout for receiving - use the same timeout as in receive_full_response
-            self.sock.settimeout(15.0)  # Match the addon's timeout
-            
-            # Receive the response using the improved receive_full_response method
-            response_data = self.receive_full_response(self.sock)
-            logger.info(f"Received {len(response_data)} bytes of data")
-            
-            response = json.loads(response_data.decode('utf-8'))
-            logger.info(f"Response parsed, status: {response.get('status', 'unknown')}")
-            
-            if response.get("status") == "error":
-                logger.error(f"Blender error: {response.get('message')}")
-                raise Exception(response.get("message", "Unknown error from Blender"))
-            
-            return response.get("result", {})
+        return request_id
+
+    def wait_for_response(self, request_id: int) -> Dict[str, Any]:
+        """Read responses until the one for ``request_id`` arrives, stashing any others"""
+        # Set a timeout for receiving - use the same timeout as in receive_full_response
+        self.sock.settimeout(15.0)  # Match the addon's timeout
+        
+        while request_id not in self._responses:
+            if self.protocol_version:
+                response = recv_frame(self.sock)
+            else:
+                # Legacy addons don't echo IDs, but they also only ever have one command in flight
+                response_data = self.receive_full_response(self.sock)
+                logger.info(f"Received {len(response_data)} bytes of data")
+                response = json.loads(response_data.decode('utf-8'))
+            if "event" in response:
+                self._handle_event(response)
+                continue
+            self._responses[response.get("id", request_id)] = response
+        
+        response = self._responses.pop(request_id)
+        logger.info(f"Response #{request_id} parsed, status: {response.get('status', 'unknown')}")
+        return response
+
+    def _handle_event(self, message: Dict[str, Any]):
+        """Apply a message the addon pushed on its own rather than in reply to a command"""
+        if message["event"] == "status":
+            self.status, self.status_time = message.get("result", {}), time.monotonic()
+            logger.info(f"Addon pushed status: {self.status}")
+
+    def get_status(self, max_age: float = STATUS_TTL) -> Dict[str, Any]:
+        """Return the addon's status snapshot, refreshing it only when older than ``max_age``"""
+        if self.status is None or time.monotonic() - self.status_time > max_age:
+            try:
+                status = self.send_command("get_status")
+            except Exception:
+                # Older addons only know the per-integration status commands
+                status = _legacy_status(self.send_command("get_polyhaven_status"))
+            self.status, self.status_time = status, time.monotonic()
+        return self.status
+
+    def send_command(self, command_type: str, params: Dict[str, Any] = None,
+                     attachments: Sequence[Any] = ()) -> Dict[str, Any]:
+        """Send a command to Blender and return the response"""
+        return self.send_commands([(command_type, params, attachments)])[0]
+
+    def send_commands(self, commands: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Send several (command_type, params[, attachments]) tuples to Blender and return their
+        results in order.
+        
+        On the framed protocol all commands are written before any response is read, so the
+        batch costs one round trip and the addon can run it in a single main-thread tick.
+        """
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Blender")
+        
+        try:
+            if self.protocol_version:
+                request_ids = [self.submit_command(*command) for command in commands]
+                logger.info(f"{len(request_ids)} command(s) sent, waiting for responses...")
+                responses = [self.wait_for_response(request_id) for request_id in request_ids]
+            else:
+                # The legacy stream can't delimit back-to-back JSON documents, so go one at a time
+                responses = [self.wait_for_response(self.submit_command(*command)) for command in commands]
         except socket.timeout:
             logger.error("Socket timeout while waiting for response from Blender")
             # Don't try to reconnect here - let the get_blender_connection handle reconnection
@@ -162,15 +331,475 @@ class BlenderConnection:
             raise Exception(f"Connection to Blender lost: {str(e)}")
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON response from Blender: {str(e)}")
-            # Try to log what was received
-            if 'response_data' in locals() and response_data:
-                logger.error(f"Raw response (first 200 bytes): {response_data[:200]}")
+            self.sock = None
             raise Exception(f"Invalid response from Blender: {str(e)}")
         except Exception as e:
             logger.error(f"Error communicating with Blender: {str(e)}")
             # Don't try to reconnect here - let the get_blender_connection handle reconnection
             self.sock = None
             raise Exception(f"Communication error with Blender: {str(e)}")
+        finally:
+            if not self.sock:
+                self._responses.clear()
+        
+        # A command that failed inside Blender leaves the connection usable
+        results = []
+        for response in responses:
+            if response.get("status") == "error":
+                logger.error(f"Blender error: {response.get('message')}")
+                raise Exception(response.get("message", "Unknown error from Blender"))
+            results.append(response_result(response))
+        return results
+
+@dataclass
+class AsyncBlenderConnection:
+    """
+    asyncio counterpart of BlenderConnection.
+
+    A single background task reads responses and resolves the future registered under
+    each request ID, so any number of coroutines can have commands in flight at once.
+    """
+    host: str
+    port: int
+    timeout: float = 15.0  # Match the addon's timeout
+    reader: asyncio.StreamReader = None
+    writer: asyncio.StreamWriter = None
+    protocol_version: int = LEGACY_PROTOCOL_VERSION
+    _request_ids: Any = field(default_factory=lambda: itertools.count(1), repr=False)
+    _pending: Dict[int, asyncio.Future] = field(default_factory=dict, repr=False)
+    # Per request: callback for the events the addon sends while it runs, and when it last sent one
+    _listeners: Dict[int, Callable[[Dict[str, Any]], None]] = field(default_factory=dict, repr=False)
+    _activity: Dict[int, float] = field(default_factory=dict, repr=False)
+    _reader_task: asyncio.Task = field(default=None, repr=False)
+    _connect_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    _legacy_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    status: Dict[str, Any] = None  # Last status snapshot reported by the addon
+    status_time: float = 0.0
+    on_frame: Callable[[Dict[str, Any]], None] = None  # Receives viewport stream frames
+    # Whether the addon's shared memory can be opened from here; None until first tried.
+    # A localhost address can still be a port forwarded from another container.
+    shared_memory_usable: bool = None
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of commands sent and still waiting for their response"""
+        return len(self._pending)
+
+    async def connect(self) -> bool:
+        """Connect to the Blender addon socket server"""
+        async with self._connect_lock:
+            if self.connected:
+                return True
+            
+            try:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout)
+                sock = self.writer.get_extra_info("socket")
+                if sock is not None:
+                    configure_socket(sock)
+                logger.info(f"Connected to Blender at {self.host}:{self.port}")
+                self.protocol_version = await asyncio.wait_for(self._negotiate_protocol(), self.timeout)
+                self._reader_task = asyncio.create_task(self._read_loop())
+                return True
+            except Exception as e:
+                logger.error(f"Failed to connect to Blender: {str(e)}")
+                await self._close_transport()
+                return False
+
+    async def _negotiate_protocol(self) -> int:
+        """Ask the addon for framed messages, falling back to legacy JSON if it doesn't know them"""
+        hello = {"type": NEGOTIATE_COMMAND, "params": {"versions": list(range(1, PROTOCOL_VERSION + 1))}}
+        self.writer.write(json.dumps(hello).encode('utf-8'))
+        await self.writer.drain()
+        response = await self._read_legacy_message()
+        version = response.get("result", {}).get("version", LEGACY_PROTOCOL_VERSION) \
+            if response.get("status") == "success" else LEGACY_PROTOCOL_VERSION
+        if version:
+            logger.info(f"Using framed protocol v{version}")
+        else:
+            logger.info("Addon does not support framing, using legacy JSON protocol")
+        return version
+
+    async def _read_legacy_message(self) -> Dict[str, Any]:
+        """Read one bare JSON document from the legacy stream"""
+        chunks = []
+        while True:
+            chunk = await self.reader.read(8192)
+            if not chunk:
+                raise ConnectionError("Connection closed before a complete response was received")
+            chunks.append(chunk)
+            try:
+                return json.loads(b''.join(chunks).decode('utf-8'))
+            except json.JSONDecodeError:
+                continue
+
+    async def _read_message(self) -> Dict[str, Any]:
+        if not self.protocol_version:
+            return await self._read_legacy_message()
+        _, flags, length = decode_header(await self.reader.readexactly(FRAME_HEADER.size))
+        return decode_payload(await self.reader.readexactly(length), flags)
+
+    async def _read_loop(self):
+        """Dispatch every incoming response to the coroutine waiting on its request ID"""
+        try:
+            while True:
+                response = await self._read_message()
+                if "event" in response and "id" in response:
+                    self._handle_request_event(response)
+                    continue
+                if "event" in response:
+                    self._handle_event(response)
+                    continue
+                request_id = response.get("id")
+                if request_id is None and self._pending:
+                    # Legacy addons don't echo IDs; they only ever have one command in flight
+                    request_id = next(iter(self._pending))
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    logger.warning(f"Dropping response for unknown request #{request_id}")
+                elif not future.done():
+                    future.set_result(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, asyncio.IncompleteReadError):
+                logger.error(f"Error reading from Blender: {str(e)}")
+            self._fail_pending(ConnectionError(f"Connection to Blender lost: {str(e) or 'closed'}"))
+            await self._close_transport()
+
+    def _handle_event(self, message: Dict[str, Any]):
+        """Apply a message the addon pushed on its own rather than in reply to a command"""
+        if message["event"] == "status":
+            self.status, self.status_time = message.get("result", {}), time.monotonic()
+            logger.info(f"Addon pushed status: {self.status}")
+        elif message["event"] == "frame" and self.on_frame is not None:
+            self.on_frame(response_result(message))
+
+    def _handle_request_event(self, message: Dict[str, Any]):
+        """An event about a command still running: output, progress or a heartbeat"""
+        request_id = message["id"]
+        if request_id not in self._activity:
+            return
+        self._activity[request_id] = time.monotonic()
+        listener = self._listeners.get(request_id)
+        if listener is not None:
+            try:
+                listener(message)
+            except Exception as e:
+                logger.error(f"Error in event listener for request #{request_id}: {str(e)}")
+
+    async def get_status(self, max_age: float = STATUS_TTL) -> Dict[str, Any]:
+        """Return the addon's status snapshot, refreshing it only when older than ``max_age``"""
+        if self.status is None or time.monotonic() - self.status_time > max_age:
+            try:
+                status = await self.send_command("get_status")
+            except Exception:
+                # Older addons only know the per-integration status commands
+                status = _legacy_status(await self.send_command("get_polyhaven_status"))
+            self.status, self.status_time = status, time.monotonic()
+        return self.status
+
+    def _fail_pending(self, error: Exception):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def _close_transport(self):
+        writer, self.reader, self.writer = self.writer, None, None
+        self.protocol_version = LEGACY_PROTOCOL_VERSION
+        self.status = None  # The next connection may be to a different addon state
+        if writer is not None:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception as e:
+                logger.error(f"Error disconnecting from Blender: {str(e)}")
+
+    async def get_arrays(self, command_type: str, params: Dict[str, Any] = None
+                         ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Run a command that returns binary arrays, such as get_mesh_data, and return its
+        result along with {array name: buffer}. A Blender on this machine hands the arrays
+        over in shared memory; a remote one sends them as frame attachments. If the shared
+        memory turns out not to be reachable from here, the command is sent again for
+        attachments, and this connection uses them from then on.
+        """
+        local = self.host in LOCAL_HOSTS and self.shared_memory_usable is not False
+        params = dict(params or {}, transport="shared_memory" if local else "attachments")
+        result = await self.send_command(command_type, params)
+        arrays = result.get("arrays", {})
+        if "shared_memory" in result:
+            block = result.pop("shared_memory")
+            try:
+                buffers = _read_shared_memory(block["name"], {
+                    name: (meta["offset"], _array_nbytes(meta)) for name, meta in arrays.items()
+                })
+            except OSError as e:
+                # e.g. Blender runs in another container behind a forwarded localhost port
+                logger.warning(f"Can't open Blender's shared memory ({str(e)}), using attachments instead")
+                buffers = None
+            finally:
+                await self.send_command("release_shared_buffer", {"name": block["name"]})
+            self.shared_memory_usable = buffers is not None
+            if buffers is None:
+                return await self.get_arrays(command_type, params)
+            for meta in arrays.values():
+                del meta["offset"]
+        else:
+            attachments = result.pop("attachments", [])
+            buffers = {name: attachments[meta.pop("attachment")] for name, meta in arrays.items()}
+        return result, buffers
+
+    async def stream_viewport(self, deadline: Optional[float] = None,
+                              **options) -> AsyncIterator[Tuple[Dict[str, Any], bytes]]:
+        """
+        Yield (frame info, encoded image) for each viewport frame the addon pushes; see the
+        addon's start_viewport_stream for ``options``. Frames arrive on a connection of
+        their own, so they never queue behind command responses on this one, and a
+        consumer that falls behind skips to the newest frames. The stream ends at
+        ``deadline`` (a time.monotonic() value) when one is given.
+        """
+        channel = AsyncBlenderConnection(self.host, self.port, timeout=self.timeout)
+        frames: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_FRAMES)
+
+        def on_frame(frame: Dict[str, Any]):
+            if frames.full():
+                frames.get_nowait()
+            frames.put_nowait(frame)
+
+        channel.on_frame = on_frame
+        if not await channel.connect():
+            raise ConnectionError(f"Could not open a stream connection to {self.host}:{self.port}")
+        try:
+            result = await channel.send_command("start_viewport_stream", options)
+            if "error" in result:
+                raise Exception(result["error"])
+            while True:
+                wait = self.timeout
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        return
+                try:
+                    frame = await asyncio.wait_for(frames.get(), wait)
+                except asyncio.TimeoutError:
+                    # A static scene sends nothing; only give up if the connection is gone
+                    if not channel.connected:
+                        raise ConnectionError("Viewport stream connection lost")
+                    continue
+                image = frame.pop("attachments")[0]
+                yield frame, bytes(image)
+        finally:
+            if channel.connected:
+                with suppress(Exception):
+                    await channel.send_command("stop_viewport_stream")
+            await channel.disconnect()
+
+    async def disconnect(self):
+        """Disconnect from the Blender addon"""
+        task, self._reader_task = self._reader_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._fail_pending(ConnectionError("Disconnected from Blender"))
+        await self._close_transport()
+
+    async def send_command(self, command_type: str, params: Dict[str, Any] = None,
+                           attachments: Sequence[Any] = (),
+                           on_event: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Send a command to Blender and return the response.
+        
+        ``on_event`` is called from the reader task with every event the addon sends about
+        this command while it runs ({"event": "output" | "progress" | "running", "result": ...}).
+        Each event also restarts the timeout.
+        """
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Blender")
+        
+        if self.protocol_version:
+            response = await self._request(command_type, params, attachments, on_event)
+        else:
+            # The legacy stream can't delimit back-to-back JSON documents, so go one at a time
+            async with self._legacy_lock:
+                response = await self._request(command_type, params, attachments, on_event)
+        
+        if response.get("status") == "error":
+            logger.error(f"Blender error: {response.get('message')}")
+            raise Exception(response.get("message", "Unknown error from Blender"))
+        return response_result(response)
+
+    async def send_commands(self, commands: List[tuple]) -> List[Dict[str, Any]]:
+        """Send several (command_type, params[, attachments]) tuples concurrently and return their results in order"""
+        return list(await asyncio.gather(*(self.send_command(*command) for command in commands)))
+
+    async def _request(self, command_type: str, params: Dict[str, Any] = None,
+                       attachments: Sequence[Any] = (),
+                       on_event: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        request_id = next(self._request_ids)
+        command = {
+            "id": request_id,
+            "type": command_type,
+            "params": params or {}
+        }
+        logger.info(f"Sending command #{request_id}: {command_type} with params: {params}")
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        started = self._activity[request_id] = time.monotonic()
+        if on_event is not None:
+            self._listeners[request_id] = on_event
+        try:
+            if self.protocol_version:
+                self.writer.write(encode_frame(command, version=self.protocol_version, attachments=attachments))
+            else:
+                if attachments:
+                    command = inline_attachments(command, attachments)
+                self.writer.write(json.dumps(command).encode('utf-8'))
+            await self.writer.drain()
+            while True:
+                # Time out only once the addon has gone quiet about this command
+                deadline = min(self._activity[request_id] + self.timeout, started + COMMAND_TIME_LIMIT)
+                try:
+                    return await asyncio.wait_for(asyncio.shield(future), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    if time.monotonic() >= min(self._activity[request_id] + self.timeout,
+                                               started + COMMAND_TIME_LIMIT):
+                        raise
+        except asyncio.TimeoutError:
+            logger.error("Timeout while waiting for response from Blender")
+            if not self.protocol_version:
+                # A late legacy reply would be taken for the next command's, so start over
+                await self.disconnect()
+            raise Exception("Timeout waiting for Blender response - try simplifying your request")
+        except (ConnectionError, BrokenPipeError, ConnectionResetError) as e:
+            logger.error(f"Socket connection error: {str(e)}")
+            await self.disconnect()
+            raise Exception(f"Connection to Blender lost: {str(e)}")
+        finally:
+            self._pending.pop(request_id, None)
+            self._listeners.pop(request_id, None)
+            self._activity.pop(request_id, None)
+
+def parse_endpoints(spec: str) -> List[Tuple[str, int]]:
+    """Parse "host:port,host:first-last,..." into a list of (host, port) pairs"""
+    endpoints = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, ports = entry.rpartition(":")
+        if not host or not ports:
+            raise ValueError(f"Invalid Blender endpoint {entry!r}, expected host:port")
+        first, _, last = ports.partition("-")
+        for port in range(int(first), int(last or first) + 1):
+            endpoints.append((host, port))
+    if not endpoints:
+        raise ValueError("No Blender endpoints configured")
+    return endpoints
+
+
+class BlenderConnectionPool:
+    """
+    Routes commands across several Blender addon instances.
+
+    Each MCP session sticks to the instance it was first routed to, so an agent keeps
+    working on the same scene; new sessions go to the healthy instance with the fewest
+    commands in flight. A background task reconnects to endpoints that were down. If a
+    session's instance can't be reconnected its commands fail, unless ``allow_migration``
+    lets the session move to another instance.
+    """
+
+    def __init__(self, endpoints: List[Tuple[str, int]], health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 allow_migration: bool = ALLOW_SESSION_MIGRATION):
+        self.connections = [AsyncBlenderConnection(host=host, port=port) for host, port in endpoints]
+        self.health_check_interval = health_check_interval
+        self.allow_migration = allow_migration
+        self._retry_at: Dict[int, float] = {}  # id(connection) -> monotonic time of next connect attempt
+        self._sticky = weakref.WeakKeyDictionary()  # MCP session -> AsyncBlenderConnection
+        self._health_task: asyncio.Task = None
+        self._lock = asyncio.Lock()
+
+    def start(self):
+        """Start the background health check loop"""
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        task, self._health_task = self._health_task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        for connection in self.connections:
+            await connection.disconnect()
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Error checking Blender pool health: {str(e)}")
+            await asyncio.sleep(self.health_check_interval)
+
+    async def check_health(self, force: bool = False):
+        """Reconnect endpoints that are down and refresh the status of those that are up"""
+        await asyncio.gather(*(self._check_connection(c, force) for c in self.connections))
+
+    async def _check_connection(self, connection: AsyncBlenderConnection, force: bool):
+        if connection.connected:
+            with suppress(Exception):
+                # Served from the TTL cache most of the time, so this is rarely a round trip
+                await connection.get_status()
+            return
+        if not force and time.monotonic() < self._retry_at.get(id(connection), 0.0):
+            return
+        if await connection.connect():
+            self._retry_at.pop(id(connection), None)
+            logger.info(f"Blender at {connection.host}:{connection.port} is available")
+        else:
+            self._retry_at[id(connection)] = time.monotonic() + RECONNECT_BACKOFF
+
+    async def acquire(self, session: Any = None) -> AsyncBlenderConnection:
+        """Pick the connection for a session: its sticky instance, else the least loaded"""
+        async with self._lock:
+            previous = self._sticky.get(session) if session is not None else None
+            if previous is not None:
+                if previous.connected:
+                    return previous
+                # Often a transient drop (e.g. a legacy timeout disconnects): try it again first
+                if await previous.connect():
+                    self._retry_at.pop(id(previous), None)
+                    return previous
+                if not self.allow_migration:
+                    raise Exception(f"The Blender instance at {previous.host}:{previous.port} this session "
+                                    f"is working with is not reachable. Restart it, or start a new session "
+                                    f"to work with another instance.")
+            
+            healthy = [c for c in self.connections if c.connected]
+            if not healthy:
+                await self.check_health(force=True)
+                healthy = [c for c in self.connections if c.connected]
+            if not healthy:
+                raise Exception("Could not connect to Blender. Make sure the Blender addon is running.")
+            
+            # Break in-flight ties by how many sessions are already pinned to each instance
+            sessions = Counter(id(c) for c in self._sticky.values())
+            connection = min(healthy, key=lambda c: (c.in_flight, sessions[id(c)]))
+            
+            if session is not None:
+                if previous is not None:
+                    logger.warning(f"Blender at {previous.host}:{previous.port} is down, "
+                                   f"moving session to {connection.host}:{connection.port}")
+                try:
+                    self._sticky[session] = connection
+                except TypeError:
+                    pass  # Session object can't be weakly referenced; route it per call
+            return connection
+
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
@@ -183,21 +812,26 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
         logger.info("BlenderMCP server starting up")
         
         # Try to connect to Blender on startup to verify it's available
-        try:
-            # This will initialize the global connection if needed
-            blender = get_blender_connection()
-            logger.info("Successfully connected to Blender on startup")
-        except Exception as e:
-            logger.warning(f"Could not connect to Blender on startup: {str(e)}")
+        pool = get_blender_pool()
+        await pool.check_health(force=True)
+        available = sum(c.connected for c in pool.connections)
+        if available:
+            logger.info(f"Successfully connected to {available}/{len(pool.connections)} Blender instance(s) on startup")
+        else:
+            logger.warning("Could not connect to Blender on startup")
             logger.warning("Make sure the Blender addon is running before using Blender resources or tools")
+        pool.start()
         
-        # Return an empty context - we're using the global connection
+        # Return an empty context - we're using the global connection pool
         yield {}
     finally:
-        # Clean up the global connection on shutdown
-        global _blender_connection
-        if _blender_connection:
+        # Clean up the global connections on shutdown
+        global _blender_connection, _blender_pool
+        if _blender_pool:
             logger.info("Disconnecting from Blender on shutdown")
+            await _blender_pool.close()
+            _blender_pool = None
+        if _blender_connection:
             _blender_connection.disconnect()
             _blender_connection = None
         logger.info("BlenderMCP server shut down")
@@ -219,47 +853,149 @@ mcp = FastMCP(
 
 # Global connection for resources (since resources can't access context)
 _blender_connection = None
-_polyhaven_enabled = False  # Add this global variable
+_blender_pool = None  # Shared by all MCP sessions; used by the tools
 
 def get_blender_connection():
-    """Get or create a persistent Blender connection"""
-    global _blender_connection, _polyhaven_enabled  # Add _polyhaven_enabled to globals
+    """
+    Get or create a persistent Blender connection to the first configured endpoint.
     
-    # If we have an existing connection, check if it's still valid
-    if _blender_connection is not None:
-        try:
-            # First check if PolyHaven is enabled by sending a ping command
-            result = _blender_connection.send_command("get_polyhaven_status")
-            # Store the PolyHaven status globally
-            _polyhaven_enabled = result.get("enabled", False)
-            return _blender_connection
-        except Exception as e:
-            # Connection is dead, close it and create a new one
-            logger.warning(f"Existing connection is no longer valid: {str(e)}")
-            try:
-                _blender_connection.disconnect()
-            except:
-                pass
-            _blender_connection = None
+    There is no liveness ping: a dead socket surfaces as a send/recv error (or a failed
+    TCP keepalive probe), which drops it, and the next command reconnects lazily.
+    """
+    global _blender_connection
     
     # Create a new connection if needed
     if _blender_connection is None:
-        _blender_connection = BlenderConnection(host="localhost", port=9876)
-        if not _blender_connection.connect():
+        host, port = parse_endpoints(BLENDER_ENDPOINTS)[0]
+        connection = BlenderConnection(host=host, port=port)
+        if not connection.connect():
             logger.error("Failed to connect to Blender")
-            _blender_connection = None
             raise Exception("Could not connect to Blender. Make sure the Blender addon is running.")
+        _blender_connection = connection
         logger.info("Created new persistent connection to Blender")
     
     return _blender_connection
 
 
+def get_blender_pool() -> BlenderConnectionPool:
+    """Get or create the pool of Blender instances configured by BLENDER_MCP_ENDPOINTS"""
+    global _blender_pool
+    if _blender_pool is None:
+        _blender_pool = BlenderConnectionPool(parse_endpoints(BLENDER_ENDPOINTS))
+        logger.info(f"Routing to {len(_blender_pool.connections)} Blender endpoint(s)")
+    return _blender_pool
+
+
+def _session_of(ctx: Context) -> Any:
+    """The MCP session behind a tool call, used as the pool's stickiness key"""
+    try:
+        return ctx.session
+    except Exception:
+        return None
+
+
+# MCP session -> the name its execute_code globals go by in Blender
+_session_keys = weakref.WeakKeyDictionary()
+
+
+def _session_key(ctx: Context) -> str:
+    """A stable name for the MCP session behind a tool call, or None if there isn't one"""
+    session = _session_of(ctx) if ctx is not None else None
+    if session is None:
+        return None
+    try:
+        return _session_keys.setdefault(session, uuid.uuid4().hex)
+    except TypeError:
+        # Not weak-referenceable; fall back to a fresh namespace per call
+        return None
+
+
+class _EventRelay:
+    """
+    Forward a running command's output and progress events to the MCP client as log and
+    progress notifications, in the order they arrived. Use as the command's on_event.
+    """
+    def __init__(self, ctx: Context):
+        self.ctx = ctx
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task = None
+
+    def __call__(self, message: Dict[str, Any]):
+        self.queue.put_nowait(message)
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.queue.put_nowait(None)
+        await self.task
+
+    async def _run(self):
+        while (message := await self.queue.get()) is not None:
+            result = message.get("result") or {}
+            try:
+                if message["event"] == "output":
+                    text = result["text"].rstrip("\n")
+                    if text:
+                        await self.ctx.info(text)
+                elif message["event"] == "progress":
+                    await self.ctx.report_progress(result["progress"], result.get("total"))
+                    if result.get("message"):
+                        await self.ctx.info(result["message"])
+            except Exception as e:
+                logger.warning(f"Could not forward {message['event']} event: {str(e)}")
+
+
+async def get_async_blender_connection(ctx: Context = None) -> AsyncBlenderConnection:
+    """
+    Get the asyncio Blender connection a tool call should use.
+    
+    Calls from the same MCP session are routed to the same Blender instance. There is no
+    liveness ping: AsyncBlenderConnection notices a dead socket from its reader task or a
+    failed write, and the pool routes around it and reconnects in the background.
+    """
+    return await get_blender_pool().acquire(_session_of(ctx) if ctx is not None else None)
+
+
 @mcp.tool()
-def get_scene_info(ctx: Context) -> str:
-    """Get detailed information about the current Blender scene"""
+async def get_scene_info(
+    ctx: Context,
+    cursor: str = None,
+    limit: int = 100,
+    fields: str = None,
+    types: str = None,
+    collection: str = None,
+    name_pattern: str = None,
+    layout: str = "rows"
+) -> str:
+    """
+    Get information about the current Blender scene, one page of objects at a time.
+    
+    Parameters:
+    - cursor: The next_cursor value of the previous page; omit for the first page
+    - limit: Maximum number of objects per page (default: 100, max: 1000)
+    - fields: Optional comma-separated list of per-object fields (default: name,type,location).
+      Available: name, type, location, rotation, scale, transforms (location+rotation+scale),
+      dimensions, bbox, materials, collection, parent, modifiers, visible
+    - types: Optional comma-separated list of object types to keep, e.g. "MESH,LIGHT"
+    - collection: Optional collection name; only objects in it (or its children) are listed
+    - name_pattern: Optional glob matched against object names, e.g. "Chair*"
+    - layout: "rows" for a list of objects, or "columns" for one list per field (more compact)
+    
+    The response includes matched_count and next_cursor, which is null on the last page.
+    """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("get_scene_info")
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_scene_info", {
+            "cursor": cursor,
+            "limit": limit,
+            "fields": fields,
+            "types": types,
+            "collection": collection,
+            "name_pattern": name_pattern,
+            "layout": layout
+        })
         
         # Just return the JSON representation of what Blender sent us
         return json.dumps(result, indent=2)
@@ -268,7 +1004,36 @@ def get_scene_info(ctx: Context) -> str:
         return f"Error getting scene info: {str(e)}"
 
 @mcp.tool()
-def get_object_info(ctx: Context, object_name: str) -> str:
+async def get_scene_changes(ctx: Context, since_version: int = 0, fields: str = None) -> str:
+    """
+    Get only the objects that changed in the Blender scene since an earlier call,
+    instead of re-reading the whole scene with get_scene_info.
+    
+    Parameters:
+    - since_version: The version returned by the previous get_scene_changes call (0 at first)
+    - fields: Optional comma-separated list of fields to include for each changed object,
+      same as get_scene_info (default: name,type,location)
+    
+    Each change lists the object and what happened to it (added, removed, transform,
+    geometry, data). Pass the returned version on the next call; when "more" is true, call
+    again right away. When "reset" is true the change history doesn't reach back that far,
+    so re-read the scene with get_scene_info and continue from the returned version.
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_scene_changes", {
+            "since_version": since_version,
+            "fields": fields
+        })
+        
+        # Just return the JSON representation of what Blender sent us
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting scene changes from Blender: {str(e)}")
+        return f"Error getting scene changes: {str(e)}"
+
+@mcp.tool()
+async def get_object_info(ctx: Context, object_name: str) -> str:
     """
     Get detailed information about a specific object in the Blender scene.
     
@@ -276,8 +1041,8 @@ def get_object_info(ctx: Context, object_name: str) -> str:
     - object_name: The name of the object to get information about
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("get_object_info", {"name": object_name})
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_object_info", {"name": object_name})
         
         # Just return the JSON representation of what Blender sent us
         return json.dumps(result, indent=2)
@@ -286,42 +1051,213 @@ def get_object_info(ctx: Context, object_name: str) -> str:
         return f"Error getting object info: {str(e)}"
 
 @mcp.tool()
-def get_viewport_screenshot(ctx: Context, max_size: int = 800) -> Image:
+async def get_mesh_data(
+    ctx: Context,
+    object_name: str,
+    arrays: str = None,
+    evaluated: bool = False,
+    world_space: bool = False,
+    output_dir: str = None
+) -> str:
+    """
+    Export a mesh's geometry as NumPy .npy files, for analysis or processing outside Blender.
+    Much faster than printing vertices from execute_blender_code.
+    
+    Parameters:
+    - object_name: The name of the mesh object
+    - arrays: Optional comma-separated list of arrays (default: positions,indices,face_sizes).
+      Available: positions, normals, edges, indices (vertex index per face corner),
+      face_sizes (corners per face), triangles, uvs, or the name of any mesh attribute
+    - evaluated: Export the mesh with its modifiers applied
+    - world_space: Transform positions by the object's world matrix
+    - output_dir: Directory to write the files to (default: a new temporary directory)
+    
+    Returns the element counts and, for each array, its file path, dtype and shape.
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        result, buffers = await blender.get_arrays("get_mesh_data", {
+            "name": object_name,
+            "arrays": arrays,
+            "evaluated": evaluated,
+            "world_space": world_space
+        })
+        
+        output_dir = output_dir or tempfile.mkdtemp(prefix="blender_mesh_")
+        os.makedirs(output_dir, exist_ok=True)
+        prefix = "".join(c if c.isalnum() or c in "-_" else "_" for c in result["name"])
+        for name, meta in result["arrays"].items():
+            meta["path"] = os.path.join(output_dir, f"{prefix}_{name}.npy")
+            _write_npy(meta["path"], buffers[name], meta["dtype"], meta["shape"])
+        
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting mesh data from Blender: {str(e)}")
+        return f"Error getting mesh data: {str(e)}"
+
+@mcp.tool()
+async def create_mesh_from_buffers(
+    ctx: Context,
+    name: str,
+    vertices: List[List[float]],
+    faces: List[List[int]] = None,
+    location: List[float] = None,
+    rotation: List[float] = None,
+    scale: List[float] = None,
+    collection: str = None
+) -> str:
+    """
+    Create a mesh object directly from vertex and face lists, without running any
+    operators. Much faster than building geometry with execute_blender_code.
+    
+    Parameters:
+    - name: Name of the new object and its mesh
+    - vertices: List of [x, y, z] vertex positions
+    - faces: Optional list of faces, each a list of vertex indices (3 or more)
+    - location: Optional [x, y, z] location of the object
+    - rotation: Optional [x, y, z] rotation in radians
+    - scale: Optional [x, y, z] scale
+    - collection: Optional name of the collection to link the object to (default: scene collection)
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        attachments = []
+        faces = faces or []
+        params = {
+            "name": name,
+            "positions": _attach(attachments, vertices, "f"),
+            "indices": _attach(attachments, faces, "i"),
+            "face_sizes": _attach(attachments, [len(face) for face in faces], "i"),
+            "collection": collection
+        }
+        for key, value in (("location", location), ("rotation", rotation), ("scale", scale)):
+            if value is not None:
+                params[key] = value
+        result = await blender.send_command("create_mesh_from_buffers", params, attachments)
+        message = f"Created mesh object {result['name']} with {result['vertex_count']} vertices " \
+                  f"and {result['polygon_count']} faces"
+        if result.get("corrected"):
+            message += " (Blender had to repair invalid geometry in the input)"
+        return message
+    except Exception as e:
+        logger.error(f"Error creating mesh: {str(e)}")
+        return f"Error creating mesh: {str(e)}"
+
+@mcp.tool()
+async def instantiate_objects(
+    ctx: Context,
+    source: str,
+    locations: List[List[float]],
+    rotations: List[List[float]] = None,
+    scales: List[List[float]] = None,
+    collection: str = None,
+    parent_collection: str = None,
+    linked: bool = True
+) -> str:
+    """
+    Place many copies of an existing object in one call, e.g. to scatter trees or rocks.
+    
+    Parameters:
+    - source: Name of the object to copy
+    - locations: List of [x, y, z] locations, one per copy
+    - rotations: Optional list of [x, y, z] rotations in radians, one per copy
+    - scales: Optional list of [x, y, z] scales, one per copy
+    - collection: Optional name for the new collection holding the copies
+    - parent_collection: Optional existing collection to put the new collection in
+    - linked: Share the source's mesh data (default) instead of copying it for every instance
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        attachments = []
+        params = {
+            "source": source,
+            "locations": _attach(attachments, locations, "f"),
+            "collection": collection,
+            "parent_collection": parent_collection,
+            "linked": linked
+        }
+        if rotations is not None:
+            params["rotations"] = _attach(attachments, rotations, "f")
+        if scales is not None:
+            params["scales"] = _attach(attachments, scales, "f")
+        result = await blender.send_command("instantiate_objects", params, attachments)
+        return f"Created {result['count']} copies of {source} in collection {result['collection']}"
+    except Exception as e:
+        logger.error(f"Error instantiating objects: {str(e)}")
+        return f"Error instantiating objects: {str(e)}"
+
+@mcp.tool()
+async def set_properties_batch(
+    ctx: Context,
+    operations: List[List[Any]] = None,
+    objects: List[str] = None,
+    columns: Dict[str, List[Any]] = None
+) -> str:
+    """
+    Change properties on many objects in one step, with a single scene update.
+    Use this instead of execute_blender_code to move, rotate, scale, hide or re-color objects in bulk.
+    
+    Parameters:
+    - operations: Optional list of [object_name, data_path, value], e.g.
+      [["Cube", "location", [0, 0, 1]], ["Lamp", "data.energy", 500], ["Cube", "hide_viewport", true]]
+    - objects: Object names for column edits, in the same order as the values in each column
+    - columns: Optional mapping of data_path to one value per object, e.g.
+      {"location": [[0, 0, 0], [1, 0, 0]], "scale": [[1, 1, 1], [2, 2, 2]]}
+    
+    Data paths are relative to the object: "location", "rotation_euler", "scale", "hide_render",
+    "data.energy", "active_material.diffuse_color", or a custom property like '["tag"]'.
+    Operations that fail are reported and skipped; the rest are still applied.
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("set_properties_batch", {
+            "operations": operations,
+            "objects": objects,
+            "columns": columns
+        })
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error setting properties: {str(e)}")
+        return f"Error setting properties: {str(e)}"
+
+@mcp.tool()
+async def get_viewport_screenshot(
+    ctx: Context,
+    max_size: int = 800,
+    format: str = "png",
+    quality: int = 80,
+    color_mode: str = "rgb",
+) -> Image:
     """
     Capture a screenshot of the current Blender 3D viewport.
     
+    For repeated looks at the scene, jpeg or webp at quality 60-80 are several times
+    smaller than png and cost far fewer tokens; use png when fine detail matters.
+    
     Parameters:
     - max_size: Maximum size in pixels for the largest dimension (default: 800)
+    - format: "png", "jpeg" or "webp"
+    - quality: 1-100, for jpeg and webp
+    - color_mode: "rgb", "rgba" or "bw" (grayscale)
     
     Returns the screenshot as an Image.
     """
     try:
-        blender = get_blender_connection()
-        
-        # Create temp file path
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"blender_screenshot_{os.getpid()}.png")
-        
-        result = blender.send_command("get_viewport_screenshot", {
+        blender = await get_async_blender_connection(ctx)
+        # Encoded in Blender's memory; the bytes arrive over the socket or in shared memory
+        result, buffers = await blender.get_arrays("get_viewport_screenshot", {
             "max_size": max_size,
-            "filepath": temp_path,
-            "format": "png"
+            "format": format,
+            "quality": quality,
+            "color_mode": color_mode,
         })
         
         if "error" in result:
             raise Exception(result["error"])
         
-        if not os.path.exists(temp_path):
-            raise Exception("Screenshot file was not created")
-        
-        # Read the file
-        with open(temp_path, 'rb') as f:
-            image_bytes = f.read()
-        
-        # Delete the temp file
-        os.remove(temp_path)
-        
-        return Image(data=image_bytes, format="png")
+        source = "cached" if result.get("cache_hit") else result.get("metrics")
+        logger.info(f"Screenshot {result['width']}x{result['height']} {result['format']}: {source}")
+        return Image(data=bytes(buffers["image"]), format=result["format"])
         
     except Exception as e:
         logger.error(f"Error capturing screenshot: {str(e)}")
@@ -329,24 +1265,128 @@ def get_viewport_screenshot(ctx: Context, max_size: int = 800) -> Image:
 
 
 @mcp.tool()
-def execute_blender_code(ctx: Context, code: str) -> str:
+async def watch_viewport(
+    ctx: Context,
+    duration: float = 5.0,
+    fps: float = 2.0,
+    max_frames: int = 6,
+    max_size: int = 480,
+    format: str = "jpeg",
+    quality: int = 60,
+) -> List[Image]:
+    """
+    Watch the 3D viewport for a while, e.g. during an animation or simulation, and get
+    the frames in which it visibly changed.
+    
+    A still viewport yields a single frame, so this is also cheap for checking whether
+    something is moving.
+    
+    Parameters:
+    - duration: Seconds to watch for
+    - fps: Maximum frames per second to capture
+    - max_frames: Stop after this many frames
+    - max_size: Maximum size in pixels for the largest dimension of each frame
+    - format: "jpeg", "webp" or "png"
+    - quality: 1-100, for jpeg and webp
+    """
+    blender = await get_async_blender_connection(ctx)
+    frames = []
+    stream = blender.stream_viewport(deadline=time.monotonic() + duration,
+                                     fps=fps, max_size=max_size, format=format, quality=quality)
+    try:
+        async for frame, image in stream:
+            frames.append(Image(data=image, format=frame["format"]))
+            if len(frames) >= max_frames:
+                break
+    except Exception as e:
+        logger.error(f"Error watching viewport: {str(e)}")
+        raise Exception(f"Watching the viewport failed: {str(e)}")
+    finally:
+        await stream.aclose()
+    logger.info(f"Watched the viewport for {duration}s: {len(frames)} frames")
+    return frames
+
+
+@mcp.tool()
+async def execute_blender_code(ctx: Context, code: str, reset: bool = False, cooperative: bool = False) -> str:
     """
     Execute arbitrary Python code in Blender. Make sure to do it step-by-step by breaking it into smaller chunks.
     
+    Variables, imports and functions defined by earlier calls in this session are still
+    available, so there is no need to send them again.
+    
+    Output is streamed back while the code runs. Long scripts can also call
+    report_progress(progress, total=None, message=None); they don't time out as long as they
+    keep printing or reporting progress.
+    
+    For heavy work, set cooperative=True and put a bare `yield` inside long loops: Blender
+    then keeps its UI and other commands responsive, resuming the script between frames.
+    In that mode assignments are local to the run unless declared `global`.
+    
     Parameters:
     - code: The Python code to execute
+    - reset: Start from a clean namespace, dropping everything earlier calls defined
+    - cooperative: Run the code in time slices, pausing at each `yield`
     """
     try:
         # Get the global connection
-        blender = get_blender_connection()
-        result = blender.send_command("execute_code", {"code": code})
+        blender = await get_async_blender_connection(ctx)
+        session = _session_key(ctx)
+        if reset and session:
+            await blender.send_command("reset_namespace", {"session": session})
+        async with _EventRelay(ctx) as relay:
+            result = await blender.send_command("execute_code", {
+                "code": code,
+                "session": session,
+                "cooperative": cooperative,
+            }, on_event=relay)
         return f"Code executed successfully: {result.get('result', '')}"
     except Exception as e:
         logger.error(f"Error executing code: {str(e)}")
         return f"Error executing code: {str(e)}"
 
 @mcp.tool()
-def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
+async def register_blender_helper(ctx: Context, name: str, code: str) -> str:
+    """
+    Define a reusable Python function in Blender once, then run it with call_blender_helper
+    instead of resending the same code.
+    
+    Parameters:
+    - name: The function's name
+    - code: Python code that defines a function called `name` (it may import modules and use bpy)
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("register_helper", {"name": name, "code": code})
+        return f"Registered helper {name}. Available helpers: {', '.join(result['helpers'])}"
+    except Exception as e:
+        logger.error(f"Error registering helper: {str(e)}")
+        return f"Error registering helper: {str(e)}"
+
+@mcp.tool()
+async def call_blender_helper(ctx: Context, name: str, args: List[Any] = None, kwargs: Dict[str, Any] = None) -> str:
+    """
+    Call a function registered with register_blender_helper.
+    
+    Parameters:
+    - name: The helper's name
+    - args: Optional positional arguments
+    - kwargs: Optional keyword arguments
+    
+    Returns the function's return value and anything it printed.
+    """
+    try:
+        blender = await get_async_blender_connection(ctx)
+        async with _EventRelay(ctx) as relay:
+            result = await blender.send_command("call_helper", {"name": name, "args": args, "kwargs": kwargs},
+                                                on_event=relay)
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error calling helper: {str(e)}")
+        return f"Error calling helper: {str(e)}"
+
+@mcp.tool()
+async def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
     """
     Get a list of categories for a specific asset type on Polyhaven.
     
@@ -354,10 +1394,11 @@ def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
     - asset_type: The type of asset to get categories for (hdris, textures, models, all)
     """
     try:
-        blender = get_blender_connection()
-        if not _polyhaven_enabled:
+        blender = await get_async_blender_connection(ctx)
+        status = await blender.get_status()
+        if not status.get("polyhaven_enabled", False):
             return "PolyHaven integration is disabled. Select it in the sidebar in BlenderMCP, then run it again."
-        result = blender.send_command("get_polyhaven_categories", {"asset_type": asset_type})
+        result = await blender.send_command("get_polyhaven_categories", {"asset_type": asset_type})
         
         if "error" in result:
             return f"Error: {result['error']}"
@@ -378,10 +1419,12 @@ def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
         return f"Error getting Polyhaven categories: {str(e)}"
 
 @mcp.tool()
-def search_polyhaven_assets(
+async def search_polyhaven_assets(
     ctx: Context,
     asset_type: str = "all",
-    categories: str = None
+    categories: str = None,
+    query: str = None,
+    limit: int = 20
 ) -> str:
     """
     Search for assets on Polyhaven with optional filtering.
@@ -389,15 +1432,18 @@ def search_polyhaven_assets(
     Parameters:
     - asset_type: Type of assets to search for (hdris, textures, models, all)
     - categories: Optional comma-separated list of categories to filter by
+    - query: Optional words to look for in asset names, tags and categories (e.g. "old brick wall")
+    - limit: Maximum number of assets to return (default: 20, max: 100)
     
-    Returns a list of matching assets with basic information.
+    Returns a list of matching assets with basic information, most relevant first when
+    searching by query and most downloaded first otherwise.
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("search_polyhaven_assets", {
-            "asset_type": asset_type,
-            "categories": categories
-        })
+        blender = await get_async_blender_connection(ctx)
+        params = {"asset_type": asset_type, "categories": categories}
+        if query or limit != 20:
+            params.update(query=query, limit=limit)  # Older addons take neither
+        result = await blender.send_command("search_polyhaven_assets", params)
         
         if "error" in result:
             return f"Error: {result['error']}"
@@ -408,12 +1454,16 @@ def search_polyhaven_assets(
         returned_count = result["returned_count"]
         
         formatted_output = f"Found {total_count} assets"
+        if query:
+            formatted_output += f" matching '{query}'"
         if categories:
             formatted_output += f" in categories: {categories}"
         formatted_output += f"\nShowing {returned_count} assets:\n\n"
         
-        # Sort assets by download count (popularity)
-        sorted_assets = sorted(assets.items(), key=lambda x: x[1].get("download_count", 0), reverse=True)
+        # Query results come ranked by relevance; otherwise sort by download count (popularity)
+        sorted_assets = list(assets.items())
+        if not query:
+            sorted_assets.sort(key=lambda x: x[1].get("download_count", 0), reverse=True)
         
         for asset_id, asset_data in sorted_assets:
             formatted_output += f"- {asset_data.get('name', asset_id)} (ID: {asset_id})\n"
@@ -427,7 +1477,7 @@ def search_polyhaven_assets(
         return f"Error searching Polyhaven assets: {str(e)}"
 
 @mcp.tool()
-def download_polyhaven_asset(
+async def download_polyhaven_asset(
     ctx: Context,
     asset_id: str,
     asset_type: str,
@@ -446,13 +1496,14 @@ def download_polyhaven_asset(
     Returns a message indicating success or failure.
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("download_polyhaven_asset", {
-            "asset_id": asset_id,
-            "asset_type": asset_type,
-            "resolution": resolution,
-            "file_format": file_format
-        })
+        blender = await get_async_blender_connection(ctx)
+        async with _EventRelay(ctx) as relay:
+            result = await blender.send_command("download_polyhaven_asset", {
+                "asset_id": asset_id,
+                "asset_type": asset_type,
+                "resolution": resolution,
+                "file_format": file_format
+            }, on_event=relay)
         
         if "error" in result:
             return f"Error: {result['error']}"
@@ -478,7 +1529,7 @@ def download_polyhaven_asset(
         return f"Error downloading Polyhaven asset: {str(e)}"
 
 @mcp.tool()
-def set_texture(
+async def set_texture(
     ctx: Context,
     object_name: str,
     texture_id: str
@@ -494,8 +1545,8 @@ def set_texture(
     """
     try:
         # Get the global connection
-        blender = get_blender_connection()
-        result = blender.send_command("set_texture", {
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("set_texture", {
             "object_name": object_name,
             "texture_id": texture_id
         })
@@ -537,14 +1588,14 @@ def set_texture(
         return f"Error applying texture: {str(e)}"
 
 @mcp.tool()
-def get_polyhaven_status(ctx: Context) -> str:
+async def get_polyhaven_status(ctx: Context) -> str:
     """
     Check if PolyHaven integration is enabled in Blender.
     Returns a message indicating whether PolyHaven features are available.
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("get_polyhaven_status")
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_polyhaven_status")
         enabled = result.get("enabled", False)
         message = result.get("message", "")
         if enabled:
@@ -555,7 +1606,7 @@ def get_polyhaven_status(ctx: Context) -> str:
         return f"Error checking PolyHaven status: {str(e)}"
 
 @mcp.tool()
-def get_hyper3d_status(ctx: Context) -> str:
+async def get_hyper3d_status(ctx: Context) -> str:
     """
     Check if Hyper3D Rodin integration is enabled in Blender.
     Returns a message indicating whether Hyper3D Rodin features are available.
@@ -563,8 +1614,8 @@ def get_hyper3d_status(ctx: Context) -> str:
     Don't emphasize the key type in the returned message, but sliently remember it. 
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("get_hyper3d_status")
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_hyper3d_status")
         enabled = result.get("enabled", False)
         message = result.get("message", "")
         if enabled:
@@ -575,14 +1626,14 @@ def get_hyper3d_status(ctx: Context) -> str:
         return f"Error checking Hyper3D status: {str(e)}"
 
 @mcp.tool()
-def get_sketchfab_status(ctx: Context) -> str:
+async def get_sketchfab_status(ctx: Context) -> str:
     """
     Check if Sketchfab integration is enabled in Blender.
     Returns a message indicating whether Sketchfab features are available.
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("get_sketchfab_status")
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("get_sketchfab_status")
         enabled = result.get("enabled", False)
         message = result.get("message", "")
         if enabled:
@@ -593,7 +1644,7 @@ def get_sketchfab_status(ctx: Context) -> str:
         return f"Error checking Sketchfab status: {str(e)}"
 
 @mcp.tool()
-def search_sketchfab_models(
+async def search_sketchfab_models(
     ctx: Context,
     query: str,
     categories: str = None,
@@ -613,9 +1664,9 @@ def search_sketchfab_models(
     """
     try:
         
-        blender = get_blender_connection()
+        blender = await get_async_blender_connection(ctx)
         logger.info(f"Searching Sketchfab models with query: {query}, categories: {categories}, count: {count}, downloadable: {downloadable}")
-        result = blender.send_command("search_sketchfab_models", {
+        result = await blender.send_command("search_sketchfab_models", {
             "query": query,
             "categories": categories,
             "count": count,
@@ -670,7 +1721,7 @@ def search_sketchfab_models(
         return f"Error searching Sketchfab models: {str(e)}"
 
 @mcp.tool()
-def download_sketchfab_model(
+async def download_sketchfab_model(
     ctx: Context,
     uid: str
 ) -> str:
@@ -685,12 +1736,13 @@ def download_sketchfab_model(
     """
     try:
         
-        blender = get_blender_connection()
+        blender = await get_async_blender_connection(ctx)
         logger.info(f"Attempting to download Sketchfab model with UID: {uid}")
         
-        result = blender.send_command("download_sketchfab_model", {
-            "uid": uid
-        })
+        async with _EventRelay(ctx) as relay:
+            result = await blender.send_command("download_sketchfab_model", {
+                "uid": uid
+            }, on_event=relay)
         
         if result is None:
             logger.error("Received None result from Sketchfab download")
@@ -722,7 +1774,7 @@ def _process_bbox(original_bbox: list[float] | list[int] | None) -> list[int] |
     return [int(float(i) / max(original_bbox) * 100) for i in original_bbox] if original_bbox else None
 
 @mcp.tool()
-def generate_hyper3d_model_via_text(
+async def generate_hyper3d_model_via_text(
     ctx: Context,
     text_prompt: str,
     bbox_condition: list[float]=None
@@ -739,8 +1791,8 @@ def generate_hyper3d_model_via_text(
     Returns a message indicating success or failure.
     """
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("create_rodin_job", {
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("create_rodin_job", {
             "text_prompt": text_prompt,
             "images": None,
             "bbox_condition": _process_bbox(bbox_condition),
@@ -758,7 +1810,7 @@ def generate_hyper3d_model_via_text(
         return f"Error generating Hyper3D task: {str(e)}"
 
 @mcp.tool()
-def generate_hyper3d_model_via_images(
+async def generate_hyper3d_model_via_images(
     ctx: Context,
     input_image_paths: list[str]=None,
     input_image_urls: list[str]=None,
@@ -795,8 +1847,8 @@ def generate_hyper3d_model_via_images(
             return "Error: not all image URLs are valid!"
         images = input_image_urls.copy()
     try:
-        blender = get_blender_connection()
-        result = blender.send_command("create_rodin_job", {
+        blender = await get_async_blender_connection(ctx)
+        result = await blender.send_command("create_rodin_job", {
             "text_prompt": None,
             "images": images,
             "bbox_condition": _process_bbox(bbox_condition),
@@ -814,7 +1866,7 @@ def generate_hyper3d_model_via_images(
         return f"Error generating Hyper3D task: {str(e)}"
 
 @mcp.tool()
-def poll_rodin_job_status(
+async def poll_rodin_job_status(
     ctx: Context,
     subscription_key: str=None,
     request_id: str=None,
@@ -840,7 +1892,7 @@ def poll_rodin_job_status(
         This is a polling API, so only proceed if the status are finally determined ("COMPLETED" or some failed state).
     """
     try:
-        blender = get_blender_connection()
+        blender = await get_async_blender_connection(ctx)
         kwargs = {}
         if subscription_key:
             kwargs = {
@@ -850,14 +1902,14 @@ def poll_rodin_job_status(
             kwargs = {
                 "request_id": request_id,
             }
-        result = blender.send_command("poll_rodin_job_status", kwargs)
+        result = await blender.send_command("poll_rodin_job_status", kwargs)
         return result
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
 
 @mcp.tool()
-def import_generated_asset(
+async def import_generated_asset(
     ctx: Context,
     name: str,
     task_uuid: str=None,
@@ -875,7 +1927,7 @@ def import_generated_asset(
     Return if the asset has been imported successfully.
     """
     try:
-        blender = get_blender_connection()
+        blender = await get_async_blender_connection(ctx)
         kwargs = {
             "name": name
         }
@@ -883,7 +1935,7 @@ def import_generated_asset(
             kwargs["task_uuid"] = task_uuid
         elif request_id:
             kwargs["request_id"] = request_id
-        result = blender.send_command("import_generated_asset", kwargs)
+        result = await blender.send_command("import_generated_asset", kwargs)
         return result
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")